@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import json
+import zlib
+from datetime import datetime, timedelta, UTC
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from .commands import catalog
+from .config import settings
+from .db import get_pool
+from . import queries
+from .latency import LatencyHistogram
+from .registry import registry
+
+DEFAULT_INTERVAL_SECONDS = 60
+DEFAULT_TIMEOUT_SECONDS = 10
+MIN_INTERVAL_SECONDS = 1
+STARTUP_DELAY_SECONDS = 3
+MAX_IDLE_SECONDS = 60  # upper bound for one scheduler sleep
+RELOAD_RETRY_SECONDS = 2  # after a failed target reload
+MAX_INFLIGHT_PROBES = 50  # concurrent probe sends; one slow panel no longer blocks the rest
+LATENCY_PERSIST_SECONDS = 300  # how often per-client RTT windows go to alive_latency
+
+PROBE = "probe"
+TIMEOUT = "timeout"
+
+SendFn = Callable[[str, bytes], Awaitable[None]]
+
+
+@dataclass
+class ProbeTarget:
+    client_id: str
+    command_id: int
+    expected_response: bytes | None   # compared with the trimmed raw frame
+    interval: float
+    timeout: float
+    generation: int
+    # inbound traffic within the interval counts as proof of life
+    traffic_liveness: bool = False
+    # heap seq of the armed timeout while a probe is unanswered
+    awaiting_seq: int | None = None
+    # a send for this client is still running
+    in_flight: bool = False
+    # loop time the outstanding probe was written to the socket
+    sent_at: float | None = None
+
+
+class AliveScheduler:
+    """
+    Deadline-driven alive probes.
+    A heap holds (deadline, seq, client_id, kind, generation) entries: each client gets its
+    own probe interval, and a timeout entry is armed whenever a probe goes out.
+    Config changes replace one target (new generation) and stale heap entries are skipped.
+    """
+
+    def __init__(self):
+        self._targets: dict[str, ProbeTarget] = {}
+        self._heap: list[tuple[float, int, str, str, int]] = []
+        self._seq = 0
+        self._generation = 0
+        self._reload_ids: set[str] = set()
+        self._reload_all = False
+        self._wakeup = asyncio.Event()
+        self._send: SendFn | None = None
+        self._semaphore = asyncio.Semaphore(MAX_INFLIGHT_PROBES)
+        self._tasks: set[asyncio.Task] = set()
+
+        # multi-instance coordination (see poller.alive_poller)
+        self.owns: Callable[[str], bool] = lambda client_id: True
+
+        # probe round-trip times: since start (API) and current persist window
+        self.rtt: dict[str, LatencyHistogram] = {}
+        self._rtt_window: dict[str, LatencyHistogram] = {}
+        self._window_started = datetime.now(UTC)
+
+        self.probes_sent = 0
+        self.probes_saved = 0
+        self.timeouts = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.cycles = 0
+        self.last_cycle_ms = 0.0
+        self.max_cycle_ms = 0.0
+
+    # ---- config ----
+
+    async def _fetch_targets(self, client_ids: list[str] | None) -> list[ProbeTarget]:
+        pool = get_pool()
+        async with pool.acquire() as conn:
+            rows = await queries.fetch(
+                conn,
+                "alive_targets",
+                client_ids,
+            )
+
+        targets = []
+        for r in rows:
+            self._generation += 1
+            targets.append(ProbeTarget(
+                client_id=r["client_id"],
+                command_id=r["alive_command_id"],
+                expected_response=(r["alive_expected_response"] or "").encode() or None,
+                interval=max(r["alive_interval_seconds"] or DEFAULT_INTERVAL_SECONDS, MIN_INTERVAL_SECONDS),
+                timeout=r["alive_timeout_seconds"] or DEFAULT_TIMEOUT_SECONDS,
+                generation=self._generation,
+                traffic_liveness=(r["alive_mode"] or settings.ALIVE_MODE_DEFAULT) == "traffic",
+            ))
+        return targets
+
+    def request_reload(self, client_id: str | None) -> None:
+        """NOTIFY callback: reload one client, or everything when client_id is None."""
+        if client_id is None:
+            self._reload_all = True
+        else:
+            self._reload_ids.add(client_id)
+        self._wakeup.set()
+
+    async def _apply_reloads(self, now: float) -> None:
+        """Apply pending reloads; if the fetch fails they stay pending for the next tick."""
+        if self._reload_all:
+            self._reload_all = False
+            pending, self._reload_ids = self._reload_ids, set()
+            try:
+                targets = await self._fetch_targets(None)
+            except Exception:
+                self._reload_all = True
+                self._reload_ids |= pending
+                raise
+            self._targets = {}
+            self._heap = []
+            for t in targets:
+                self._install(t, now + STARTUP_DELAY_SECONDS + _jitter(t))
+            return
+
+        if not self._reload_ids:
+            return
+
+        pending, self._reload_ids = self._reload_ids, set()
+        ids = list(pending)
+        try:
+            targets = {t.client_id: t for t in await self._fetch_targets(ids)}
+        except Exception:
+            self._reload_ids |= pending
+            raise
+        for cid in ids:
+            if cid in targets:
+                self._install(targets[cid], now + _jitter(targets[cid]))
+            else:
+                # alive disabled or client removed: stale heap entries are ignored
+                self._targets.pop(cid, None)
+
+    def _install(self, target: ProbeTarget, first_probe_at: float) -> None:
+        self._targets[target.client_id] = target
+        self._push(first_probe_at, target, PROBE)
+
+    def _push(self, deadline: float, target: ProbeTarget, kind: str) -> int:
+        self._seq += 1
+        heapq.heappush(self._heap, (deadline, self._seq, target.client_id, kind, target.generation))
+        return self._seq
+
+    # ---- responses ----
+
+    def match_response(self, client_id: str, frame: bytes) -> bool:
+        """Called by handle_client for every frame (see frame_key). True if it was the alive answer."""
+        target = self._targets.get(client_id)
+        if target is None or target.expected_response is None or frame != target.expected_response:
+            return False
+
+        if target.sent_at is not None:
+            rtt = asyncio.get_running_loop().time() - target.sent_at
+            target.sent_at = None
+            self.rtt.setdefault(client_id, LatencyHistogram()).record(rtt)
+            self._rtt_window.setdefault(client_id, LatencyHistogram()).record(rtt)
+
+        target.awaiting_seq = None
+        registry.update(client_id, alive_status="connected")
+        return True
+
+    def rtt_summary(self, client_id: str) -> dict:
+        hist = self.rtt.get(client_id)
+        return hist.summary() if hist else LatencyHistogram().summary()
+
+    # ---- main loop ----
+
+    def _dispatch(self, target: ProbeTarget, now: float) -> asyncio.Task | None:
+        """Start one probe without waiting for it. Returns the task, if any."""
+        if not self.owns(target.client_id):
+            return None  # another instance is responsible for this client
+
+        state = registry.get(target.client_id)
+        if state is None:
+            return None  # never connected
+        if state.status != "connected":
+            registry.update(target.client_id, alive_status="disconnected")
+            return None
+        if target.in_flight:
+            return None  # previous send still stuck in drain()
+        if target.awaiting_seq is not None:
+            # previous probe still unanswered: its own timeout decides (timeout >= interval)
+            return None
+
+        # resolved per probe so command edits apply without rescheduling
+        cmd = catalog.get(target.command_id)
+        if cmd is None or cmd.payload is None:
+            return None  # command disabled / deleted / invalid or needs parameters
+
+        if target.traffic_liveness and state.last_seen is not None:
+            if datetime.now(UTC) - state.last_seen < timedelta(seconds=target.interval):
+                # chatty client: its own traffic proved it alive, no probe this round
+                self.probes_saved += 1
+                registry.update(target.client_id, alive_status="connected")
+                return None
+
+        # arm before sending: a fast answer may arrive while drain() is still pending
+        registry.update(target.client_id, alive_status="pending")
+        target.awaiting_seq = self._push(now + target.timeout, target, TIMEOUT)
+        target.in_flight = True
+
+        task = asyncio.create_task(self._probe(target, cmd.payload))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _probe(self, target: ProbeTarget, payload: bytes) -> None:
+        async with self._semaphore:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                target.sent_at = asyncio.get_running_loop().time()
+                await self._send(target.client_id, payload)
+                self.probes_sent += 1
+            except Exception:
+                target.sent_at = None
+                target.awaiting_seq = None
+                registry.update(target.client_id, alive_status="disconnected")
+            finally:
+                self.in_flight -= 1
+                target.in_flight = False
+
+    async def _finish_cycle(self, tasks: list[asyncio.Task], started: float) -> None:
+        await asyncio.gather(*tasks, return_exceptions=True)
+        elapsed_ms = (asyncio.get_running_loop().time() - started) * 1000
+        self.cycles += 1
+        self.last_cycle_ms = elapsed_ms
+        self.max_cycle_ms = max(self.max_cycle_ms, elapsed_ms)
+
+    def _expire(self, target: ProbeTarget, seq: int) -> None:
+        # answered already, or a newer probe is outstanding
+        if target.awaiting_seq != seq:
+            return
+        target.awaiting_seq = None
+        target.sent_at = None
+        self.timeouts += 1
+        registry.update(target.client_id, alive_status="timeout")
+
+    async def run(self, send: SendFn) -> None:
+        self._send = send
+        loop = asyncio.get_running_loop()
+        self._reload_all = True
+
+        while True:
+            self._wakeup.clear()
+            try:
+                now = loop.time()
+                reload_failed = False
+                try:
+                    await self._apply_reloads(now)
+                except Exception as e:
+                    # keep probing the current targets; the reload is retried shortly
+                    print(f"[ALIVE POLLER] reload failed, will retry: {e}")
+                    reload_failed = True
+
+                # one cycle = every entry due now; probes go out concurrently
+                cycle: list[asyncio.Task] = []
+                while self._heap and self._heap[0][0] <= now:
+                    deadline, seq, client_id, kind, generation = heapq.heappop(self._heap)
+                    target = self._targets.get(client_id)
+                    if target is None or target.generation != generation:
+                        continue  # stale entry from an older config
+
+                    if kind == PROBE:
+                        self._push(max(deadline + target.interval, now), target, PROBE)
+                        task = self._dispatch(target, now)
+                        if task is not None:
+                            cycle.append(task)
+                    else:
+                        self._expire(target, seq)
+
+                if cycle:
+                    finisher = asyncio.create_task(self._finish_cycle(cycle, now))
+                    self._tasks.add(finisher)
+                    finisher.add_done_callback(self._tasks.discard)
+
+                now = loop.time()
+                sleep_for = min(self._heap[0][0] - now, MAX_IDLE_SECONDS) if self._heap else MAX_IDLE_SECONDS
+                if reload_failed:
+                    sleep_for = min(sleep_for, RELOAD_RETRY_SECONDS)
+            except Exception as e:
+                print(f"[ALIVE POLLER] loop error: {e}")
+                sleep_for = STARTUP_DELAY_SECONDS
+
+            if sleep_for > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), sleep_for)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def persist_latency(self) -> int:
+        """Write one summary row per client that answered probes in the current window."""
+        window, self._rtt_window = self._rtt_window, {}
+        started, self._window_started = self._window_started, datetime.now(UTC)
+        if not window:
+            return 0
+
+        ids = list(window)
+        summaries = [window[cid].summary() for cid in ids]
+        pool = get_pool()
+        async with pool.acquire() as conn:
+            await queries.execute(
+                conn,
+                "insert_alive_latency",
+                ids,
+                started,
+                self._window_started,
+                [s["count"] for s in summaries],
+                [s["p50_ms"] for s in summaries],
+                [s["p95_ms"] for s in summaries],
+                [s["p99_ms"] for s in summaries],
+                [s["max_ms"] for s in summaries],
+                [json.dumps(window[cid].buckets()) for cid in ids],
+            )
+        return len(ids)
+
+    async def run_latency_persister(self) -> None:
+        while True:
+            await asyncio.sleep(LATENCY_PERSIST_SECONDS)
+            try:
+                await self.persist_latency()
+            except Exception as e:
+                print(f"[ALIVE POLLER] latency persist error: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "targets": len(self._targets),
+            "scheduled": len(self._heap),
+            "awaiting": sum(1 for t in self._targets.values() if t.awaiting_seq is not None),
+            "probes_sent": self.probes_sent,
+            "probes_saved": self.probes_saved,
+            "timeouts": self.timeouts,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "cycles": self.cycles,
+            "last_cycle_ms": round(self.last_cycle_ms, 2),
+            "max_cycle_ms": round(self.max_cycle_ms, 2),
+        }
+
+
+def _jitter(target: ProbeTarget) -> float:
+    """Stable offset in [0, interval) so probes spread over the interval instead of bursting."""
+    return (zlib.crc32(target.client_id.encode()) % 1000) / 1000 * target.interval
+
+
+# Global scheduler: tcp_server reports responses, poller drives it
+scheduler = AliveScheduler()
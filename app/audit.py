@@ -1,7 +1,287 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from collections import deque
+from datetime import datetime, UTC
 from typing import Optional
+
 from fastapi import Request
+
+from .config import settings
 from .db import get_pool
 
+AUDIT_COLUMNS = (
+    "ts", "user_id", "username", "role", "action", "client_id", "client_description",
+    "message", "success", "reason", "remote_ip", "user_agent",
+)
+
+
+class AuditSink:
+    """
+    Write-behind audit log. Requests only append a record to a bounded in-memory queue;
+    one background task COPYs batches into audit_log. When the database is unreachable
+    (or the queue overflows) records go to an append-only JSONL file, which is replayed
+    into the table at start and on the next successful flush. File I/O runs in a worker
+    thread, never on the event loop. `flush()` is the barrier for actions that must be
+    persisted before the response goes out: records carry a sequence number, it waits until every record
+    up to the latest one is handled (write order) and returns False if that record ended
+    up in the fallback file (or nowhere) instead of the table.
+    """
+
+    def __init__(self, max_queue: int, batch_size: int, interval: float, fallback_path: str):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.interval = interval
+        self.fallback_path = fallback_path
+        # (seq, record) pairs
+        self._queue: deque[tuple[int, tuple]] = deque()
+        self._spill: list[tuple[int, tuple]] = []   # overflow, spilled to the file by the writer
+        self._wakeup = asyncio.Event()
+        # [seq waited for, future, that record reached the table]
+        self._waiters: list[list] = []
+        self._seq = 0
+        self._unfinished: set[int] = set()   # seqs not yet in the table / file / lost
+        self._missed: deque[int] = deque(maxlen=max_queue)   # recent seqs that missed the table
+        self.written = 0
+        self.fallback_written = 0
+        self.replayed = 0
+        self.overflow = 0
+        self.lost = 0
+
+    # ---- producers ----
+
+    def submit(self, record: tuple) -> None:
+        self._seq += 1
+        self._unfinished.add(self._seq)
+        if len(self._queue) >= self.max_queue:
+            # never block a request on the audit trail: the writer spills it to the file
+            self.overflow += 1
+            self._spill.append((self._seq, record))
+            self._wakeup.set()
+            return
+        self._queue.append((self._seq, record))
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> bool:
+        """
+        Wait until every record submitted before this call is handled. True if the last
+        of them (the caller's own, right after write_audit) is in audit_log; False if it
+        went to the fallback file or was lost.
+        """
+        target = self._seq
+        if target not in self._unfinished and (not self._unfinished or min(self._unfinished) > target):
+            return target not in self._missed
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append([target, fut, True])
+        self._wakeup.set()
+        return await fut
+
+    def _finish(self, items: list[tuple[int, tuple]], in_table: bool) -> None:
+        """Mark records handled; a waiter whose record missed the table will get False."""
+        seqs = {seq for seq, _ in items}
+        self._unfinished -= seqs
+        if not in_table and seqs:
+            self._missed.extend(sorted(seqs))
+            for waiter in self._waiters:
+                if waiter[0] in seqs:
+                    waiter[2] = False
+
+    # ---- persistence ----
+
+    def _append_fallback(self, records: list[tuple]) -> None:
+        """Blocking: append records to the JSONL file and fsync (worker thread only)."""
+        with open(self.fallback_path, "a", encoding="utf-8") as f:
+            for rec in records:
+                row = dict(zip(AUDIT_COLUMNS, rec))
+                row["ts"] = row["ts"].isoformat()
+                f.write(json.dumps(row) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def _to_fallback(self, records: list[tuple]) -> None:
+        """Spill records to the file; if even that fails they are counted as lost."""
+        try:
+            await asyncio.to_thread(self._append_fallback, records)
+            self.fallback_written += len(records)
+        except Exception as e:
+            self.lost += len(records)
+            print(f"[AUDIT] fallback write to {self.fallback_path} failed ({e}); {len(records)} record(s) lost")
+
+    async def _copy(self, records: list[tuple]) -> None:
+        pool = get_pool()
+        async with pool.acquire() as conn:
+            await conn.copy_records_to_table("audit_log", records=records, columns=AUDIT_COLUMNS)
+
+    def _take_fallback(self) -> list[tuple] | None:
+        """Blocking: move the fallback file aside and read it back (worker thread only)."""
+        replaying = self.fallback_path + ".replay"
+        if os.path.exists(self.fallback_path):
+            if os.path.exists(replaying):
+                # a replay interrupted by a crash: add to it, never overwrite it
+                with open(self.fallback_path, encoding="utf-8") as src, open(replaying, "a", encoding="utf-8") as dst:
+                    dst.write(src.read())
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                os.remove(self.fallback_path)
+            else:
+                os.replace(self.fallback_path, replaying)
+        elif not os.path.exists(replaying):
+            return None
+        records = []
+        with open(replaying, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    row["ts"] = datetime.fromisoformat(row["ts"])
+                    records.append(tuple(row[c] for c in AUDIT_COLUMNS))
+        return records
+
+    def _finish_replay(self, ok: bool) -> None:
+        """Blocking: drop the replayed file, or put it back for the next attempt."""
+        replaying = self.fallback_path + ".replay"
+        if not ok:
+            # anything spilled meanwhile is appended after
+            with open(replaying, encoding="utf-8") as src, open(self.fallback_path, "a", encoding="utf-8") as dst:
+                dst.write(src.read())
+        os.remove(replaying)
+
+    async def _replay_fallback(self) -> None:
+        """
+        Move records spilled during an outage (or left in .replay by a crash) into the
+        table. Called at start and after each good COPY.
+        """
+        records = await asyncio.to_thread(self._take_fallback)
+        if records is None:
+            return
+        try:
+            await self._copy(records)
+        except Exception:
+            await asyncio.to_thread(self._finish_replay, False)
+            raise
+        await asyncio.to_thread(self._finish_replay, True)
+        self.replayed += len(records)
+        print(f"[AUDIT] replayed {len(records)} record(s) from {self.fallback_path}")
+
+    async def _flush_batch(self) -> None:
+        if self._spill:
+            spill, self._spill = self._spill, []
+            try:
+                await self._to_fallback([rec for _, rec in spill])
+            finally:
+                self._finish(spill, in_table=False)
+
+        batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.batch_size))]
+        if batch:
+            records = [rec for _, rec in batch]
+            try:
+                await self._copy(records)
+            except Exception as e:
+                print(f"[AUDIT] COPY failed ({e}); {len(batch)} record(s) to {self.fallback_path}")
+                try:
+                    await self._to_fallback(records)
+                finally:
+                    self._finish(batch, in_table=False)
+            else:
+                self.written += len(batch)
+                self._finish(batch, in_table=True)
+                try:
+                    await self._replay_fallback()
+                except Exception as e:
+                    print(f"[AUDIT] fallback replay failed: {e}")
+
+    def _release_waiters(self) -> None:
+        """Resolve every waiter once all seqs up to its own are handled."""
+        oldest = min(self._unfinished) if self._unfinished else self._seq + 1
+        still_waiting = []
+        for waiter in self._waiters:
+            target, fut, ok = waiter
+            if target < oldest:
+                if not fut.done():
+                    fut.set_result(ok)
+            else:
+                still_waiting.append(waiter)
+        self._waiters = still_waiting
+
+    async def run(self) -> None:
+        try:
+            # pick up what a previous run left in the fallback / .replay file
+            await self._replay_fallback()
+        except Exception as e:
+            print(f"[AUDIT] startup replay failed: {e}")
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                while True:
+                    try:
+                        await self._flush_batch()
+                    except Exception as e:
+                        # the sink must outlive any single bad batch
+                        print(f"[AUDIT] flush error: {e}")
+                    self._release_waiters()
+                    if not self._queue and not self._spill:
+                        break
+        finally:
+            # shutdown: whatever is still queued goes to the table or the file
+            items = self._spill + list(self._queue)
+            self._spill = []
+            self._queue.clear()
+            records = [rec for _, rec in items]
+            in_table = False
+            if records:
+                try:
+                    await self._copy(records)
+                    in_table = True
+                except Exception:
+                    try:
+                        self._append_fallback(records)
+                    except Exception as e:
+                        print(f"[AUDIT] shutdown: {len(records)} record(s) lost ({e})")
+            self._finish(items, in_table)
+            self._release_waiters()
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._queue),
+            "written": self.written,
+            "fallback_written": self.fallback_written,
+            "replayed": self.replayed,
+            "overflow": self.overflow,
+            "lost": self.lost,
+        }
+
+
+audit_sink = AuditSink(
+    settings.AUDIT_QUEUE_MAX,
+    settings.AUDIT_BATCH_SIZE,
+    settings.AUDIT_FLUSH_SECONDS,
+    settings.AUDIT_FALLBACK_PATH,
+)
+
+
+def _record(request: Request, user: Optional[dict], row: dict) -> tuple:
+    return (
+        datetime.now(UTC),
+        user["id"] if user else None,
+        user["username"] if user else None,
+        user["role"] if user else None,
+        row["action"],
+        row.get("client_id"),
+        row.get("client_description"),
+        row.get("message"),
+        row.get("success", True),
+        row.get("reason"),
+        request.client.host if request.client else None,
+        request.headers.get("user-agent"),
+    )
+
+
 async def write_audit(
     *,
     request: Request,
@@ -13,27 +293,35 @@ async def write_audit(
     success: bool = True,
     reason: Optional[str] = None,
 ):
-    pool = get_pool()
-    remote_ip = request.client.host if request.client else None
-    user_agent = request.headers.get("user-agent")
-
-    async with pool.acquire() as conn:
-        await conn.execute(
-            """
-            INSERT INTO audit_log
-              (user_id, username, role, action, client_id, client_description, message, success, reason, remote_ip, user_agent)
-            VALUES
-              ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11);
-            """,
-            user["id"] if user else None,
-            user["username"] if user else None,
-            user["role"] if user else None,
-            action,
-            client_id,
-            client_description,
-            message,
-            success,
-            reason,
-            remote_ip,
-            user_agent,
-        )
+    """Queue one audit row (persisted by the sink; await flush_audit() to wait for it)."""
+    audit_sink.submit(_record(request, user, {
+        "action": action,
+        "client_id": client_id,
+        "client_description": client_description,
+        "message": message,
+        "success": success,
+        "reason": reason,
+    }))
+
+
+async def write_audit_many(
+    *,
+    request: Request,
+    user: Optional[dict],
+    rows: list[dict],
+):
+    """
+    Bulk variant of write_audit for many rows sharing the same request/user.
+    Each row: action, client_id, client_description, message, success, reason (all but
+    action optional).
+    """
+    for row in rows:
+        audit_sink.submit(_record(request, user, row))
+
+
+async def flush_audit() -> bool:
+    """
+    Barrier: wait for every audit row queued so far. True if the last one (the caller's)
+    is in audit_log; False if it only reached the fallback file (replayed later) or was lost.
+    """
+    return await audit_sink.flush()
@@ -1,15 +1,115 @@
 # app/auth_session.py
-import os, secrets
+import asyncio, hashlib, math, secrets, time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, UTC
-from fastapi import Depends, HTTPException, Request
+from fastapi import Depends, HTTPException, Request, Response
 from passlib.context import CryptContext
 
+from .config import settings
 from .db import get_pool
+from . import queries
+from .ratelimit import KeyedLimiter
 
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
-SESSION_COOKIE = os.getenv("SESSION_COOKIE", "bcontrol_session")
-SESSION_TTL_HOURS = int(os.getenv("SESSION_TTL_HOURS", "24"))
+
+
+def token_key(token: str) -> str:
+    """Cache key for a session token (same as encode(sha256(token), 'hex') in SQL)."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class SessionCache:
+    """Bounded LRU of token hash -> (user, cached until, session expires_at)."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[dict, float, datetime]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        # bumped by every invalidation; a lookup that raced one must not repopulate
+        self.generation = 0
+
+    def get(self, token: str) -> tuple[dict, datetime] | None:
+        """(user, session expires_at) or None."""
+        key = token_key(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            user, cached_until, expires_at = entry
+            if time.monotonic() < cached_until and datetime.now(UTC) < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(user), expires_at
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def extend(self, token: str, expires_at: datetime) -> None:
+        """The session was renewed: keep the cached entry, with the new expiry."""
+        key = token_key(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries[key] = (entry[0], entry[1], expires_at)
+
+    def put(self, token: str, user: dict, expires_at: datetime, generation: int) -> None:
+        if self.ttl_seconds <= 0 or generation != self.generation:
+            return
+        key = token_key(token)
+        self._entries[key] = (user, time.monotonic() + self.ttl_seconds, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate_key(self, key: str) -> None:
+        self.generation += 1
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def invalidate_user(self, user_id: int) -> None:
+        self.generation += 1
+        stale = [k for k, (user, _, _) in self._entries.items() if user["id"] == user_id]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    # ---- NOTIFY callbacks (payload None = listener reconnected, drop everything) ----
+
+    def on_users_changed(self, payload: str | None) -> None:
+        if payload is None:
+            self.clear()
+        else:
+            self.invalidate_user(int(payload))
+
+    def on_sessions_changed(self, payload: str | None) -> None:
+        if payload is None:
+            self.clear()
+        else:
+            self.invalidate_key(payload)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+        }
+
+
+session_cache = SessionCache(settings.SESSION_CACHE_TTL_SECONDS, settings.SESSION_CACHE_MAX_ENTRIES)
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -17,50 +117,214 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, password_hash: str) -> bool:
     return pwd_context.verify(password, password_hash)
 
+
+# Argon2 is deliberately slow (tens of ms of CPU, GIL released inside argon2-cffi).
+# Running it on the event loop would stall panel TCP traffic for every login attempt,
+# so the API uses these wrappers; the small pool also caps how many cores it can take.
+_hash_pool = ThreadPoolExecutor(max_workers=settings.AUTH_HASH_WORKERS, thread_name_prefix="argon2")
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_hash_pool, hash_password, password)
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(
+        _hash_pool, verify_password, password, password_hash
+    )
+
+
+class LoginGuard:
+    """Per-IP / per-user token buckets plus a cap on logins verifying at the same time."""
+
+    def __init__(self):
+        self.by_ip = KeyedLimiter(settings.LOGIN_IP_BURST, settings.LOGIN_IP_PER_MINUTE / 60)
+        self.by_user = KeyedLimiter(settings.LOGIN_USER_BURST, settings.LOGIN_USER_PER_MINUTE / 60)
+        self._slots = asyncio.Semaphore(settings.LOGIN_MAX_CONCURRENT)
+        self.in_flight = 0
+        self.rejected_busy = 0
+
+    def check(self, ip: str, username: str) -> None:
+        """Raise 429 if this IP or username is out of attempts (charges the IP bucket)."""
+        wait = self.by_user.retry_after(username.lower()) or self.by_ip.take(ip)
+        if wait:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many login attempts",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    def failed(self, username: str) -> None:
+        self.by_user.consume(username.lower())
+
+    @asynccontextmanager
+    async def slot(self):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), settings.LOGIN_QUEUE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self.rejected_busy += 1
+            raise HTTPException(status_code=503, detail="Login busy, retry", headers={"Retry-After": "1"})
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "rejected_busy": self.rejected_busy,
+            "ip": self.by_ip.stats(),
+            "user": self.by_user.stats(),
+        }
+
+
+login_guard = LoginGuard()
+
+def set_session_cookie(response: Response, token: str) -> None:
+    response.set_cookie(
+        key=settings.SESSION_COOKIE,
+        value=token,
+        httponly=True,
+        samesite="lax",
+        secure=False,          # LAN-only HTTP; when you move to HTTPS set True
+        max_age=settings.SESSION_TTL_HOURS * 3600,
+    )
+
+
+class SessionHousekeeping:
+    """
+    Sliding renewal of active sessions and a background sweeper that deletes expired
+    ones in bounded batches (every instance may run it; SKIP LOCKED keeps them apart).
+    """
+
+    def __init__(self):
+        self.renewals = 0
+        self.swept = 0
+        self.active: int | None = None
+        self.active_users: int | None = None
+        self._renewing: set[str] = set()
+
+    @staticmethod
+    def needs_renewal(expires_at: datetime) -> bool:
+        issued_at = expires_at - timedelta(hours=settings.SESSION_TTL_HOURS)
+        return datetime.now(UTC) - issued_at >= timedelta(minutes=settings.SESSION_RENEW_MINUTES)
+
+    async def renew(self, token: str, response: Response) -> None:
+        key = token_key(token)
+        if key in self._renewing:
+            return  # a concurrent request of the same session is already doing it
+        self._renewing.add(key)
+        try:
+            expires = datetime.now(UTC) + timedelta(hours=settings.SESSION_TTL_HOURS)
+            pool = get_pool()
+            async with pool.acquire() as conn:
+                result = await queries.execute(
+                    conn,
+                    "renew_session",
+                    token, expires
+                )
+            if result.split()[-1] != "0":
+                session_cache.extend(token, expires)
+                set_session_cookie(response, token)
+                self.renewals += 1
+        finally:
+            self._renewing.discard(key)
+
+    async def sweep(self) -> int:
+        """Delete expired sessions, SESSION_SWEEP_BATCH rows per statement."""
+        deleted = 0
+        pool = get_pool()
+        while True:
+            async with pool.acquire() as conn:
+                n = await queries.fetchval(
+                    conn,
+                    "sweep_sessions",
+                    settings.SESSION_SWEEP_BATCH
+                )
+            deleted += n
+            if n < settings.SESSION_SWEEP_BATCH:
+                break
+            await asyncio.sleep(0.1)  # short locks, room for other writers between batches
+
+        async with pool.acquire() as conn:
+            row = await queries.fetchrow(conn, "count_sessions")
+        self.active, self.active_users = row["sessions"], row["users"]
+        self.swept += deleted
+        return deleted
+
+    async def run_sweeper(self) -> None:
+        while True:
+            try:
+                deleted = await self.sweep()
+                if deleted:
+                    print(f"[SESSIONS] swept {deleted} expired session(s)")
+            except Exception as e:
+                print(f"[SESSIONS] sweep error: {e}")
+            await asyncio.sleep(settings.SESSION_SWEEP_SECONDS)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "active_users": self.active_users,
+            "renewals": self.renewals,
+            "swept": self.swept,
+        }
+
+
+housekeeping = SessionHousekeeping()
+
+
 async def create_session(user_id: int) -> str:
     token = secrets.token_urlsafe(32)
     now = datetime.now(UTC)
-    expires = now + timedelta(hours=SESSION_TTL_HOURS)
+    expires = now + timedelta(hours=settings.SESSION_TTL_HOURS)
 
     pool = get_pool()
     async with pool.acquire() as conn:
-        await conn.execute(
-            """
-            INSERT INTO sessions (user_id, token, expires_at)
-            VALUES ($1, $2, $3);
-            """,
+        await queries.execute(
+            conn,
+            "insert_session",
             user_id, token, expires
         )
     return token
 
 async def delete_session(token: str):
+    session_cache.invalidate_key(token_key(token))
     pool = get_pool()
     async with pool.acquire() as conn:
-        await conn.execute("DELETE FROM sessions WHERE token = $1;", token)
+        await queries.execute(conn, "delete_session", token)
 
-async def get_current_user(request: Request):
-    token = request.cookies.get(SESSION_COOKIE)
+async def get_current_user(request: Request, response: Response):
+    token = request.cookies.get(settings.SESSION_COOKIE)
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
+    cached = session_cache.get(token)
+    if cached is not None:
+        user, expires_at = cached
+        if housekeeping.needs_renewal(expires_at):
+            await housekeeping.renew(token, response)
+        return user
+    generation = session_cache.generation
+
     pool = get_pool()
     async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            """
-            SELECT u.id, u.username, u.role
-            FROM sessions s
-            JOIN users u ON u.id = s.user_id
-            WHERE s.token = $1
-              AND s.expires_at > NOW()
-              AND u.active = TRUE;
-            """,
+        row = await queries.fetchrow(
+            conn,
+            "session_user",
             token
         )
 
     if not row:
         raise HTTPException(status_code=401, detail="Invalid/expired session")
 
-    return {"id": row["id"], "username": row["username"], "role": row["role"]}
+    user = {"id": row["id"], "username": row["username"], "role": row["role"]}
+    session_cache.put(token, user, row["expires_at"], generation)
+    if housekeeping.needs_renewal(row["expires_at"]):
+        await housekeeping.renew(token, response)
+    return dict(user)
 
 def require_role(*roles: str):
     async def _guard(user=Depends(get_current_user)):
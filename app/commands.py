@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import re
+from dataclasses import dataclass
+from typing import Callable
+
+from .db import get_pool
+from .protocol.encoder import compile_command
+from .protocol.template import CompiledTemplate
+
+
+@dataclass
+class Command:
+    id: int
+    name: str
+    description: str | None
+    admin_only: bool
+    ui_visible: bool
+    # compiled once at load; None when the stored payload is invalid (see payload_error)
+    template: CompiledTemplate | None
+    payload_error: str | None = None
+    # reply correlation: predicate over incoming frames (bytes), None = fire-and-forget
+    reply_matcher: Callable[[bytes], bool] | None = None
+    reply_timeout: float = 5.0
+
+    @property
+    def payload(self) -> bytes | None:
+        """Pre-rendered bytes, or None if the command is invalid or needs parameters."""
+        return self.template.static if self.template is not None else None
+
+    def render(self, params: dict | None = None) -> bytes:
+        if self.template is None:
+            raise ValueError(self.payload_error or "invalid command")
+        return self.template.render(params)
+
+    def params(self) -> list[dict]:
+        if self.template is None:
+            return []
+        return [
+            {"name": f.name, "type": f.type, "default": f.default}
+            for f in self.template.fields.values()
+        ]
+
+
+def _reply_matcher(pattern: str | None, mode: str | None) -> Callable[[bytes], bool] | None:
+    if not pattern:
+        return None
+    expected = pattern.encode()
+    if mode == "regex":
+        return re.compile(expected).search
+    if mode == "exact":
+        return expected.__eq__
+    return lambda frame: frame.startswith(expected)
+
+
+class CommandCatalog:
+    """
+    In-memory copy of tcp_commands (enabled only, payload templates precompiled) plus the
+    client -> command compatibility sets from client_commands.
+    Reloaded as a whole on NOTIFY commands_changed; every reload bumps `version`.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._commands: dict[int, Command] = {}
+        self._by_client: dict[str, frozenset[int]] = {}
+        self._reload_task: asyncio.Task | None = None
+        self._reload_again = False
+
+    async def load(self) -> None:
+        pool = get_pool()
+        async with pool.acquire() as conn:
+            cmd_rows = await conn.fetch(
+                """
+                SELECT id, name, description, payload, encoding, checksum,
+                       append_null, append_cr, append_lf, admin_only, ui_visible,
+                       reply_pattern, reply_match, reply_timeout_ms
+                FROM tcp_commands
+                WHERE enabled = TRUE
+                """
+            )
+            link_rows = await conn.fetch(
+                """
+                SELECT client_id, command_id
+                FROM client_commands
+                WHERE enabled = TRUE
+                """
+            )
+
+        commands = {}
+        for r in cmd_rows:
+            template, matcher, error = None, None, None
+            try:
+                template = compile_command(dict(r))
+            except Exception as e:
+                error = str(e)
+            try:
+                matcher = _reply_matcher(r["reply_pattern"], r["reply_match"])
+            except re.error as e:
+                # still sendable, just without reply correlation
+                print(f"[COMMANDS] {r['name']}: invalid reply_pattern {r['reply_pattern']!r} ({e}); replies not tracked")
+            commands[r["id"]] = Command(
+                id=r["id"],
+                name=r["name"],
+                description=r["description"],
+                admin_only=bool(r["admin_only"]),
+                ui_visible=bool(r["ui_visible"]),
+                template=template,
+                payload_error=error,
+                reply_matcher=matcher,
+                reply_timeout=(r["reply_timeout_ms"] or 5000) / 1000,
+            )
+
+        by_client: dict[str, set[int]] = {}
+        for r in link_rows:
+            by_client.setdefault(r["client_id"], set()).add(r["command_id"])
+
+        # swap in one step so readers never see a half-built catalog
+        self._commands = commands
+        self._by_client = {cid: frozenset(ids) for cid, ids in by_client.items()}
+        self.version += 1
+        print(f"[COMMANDS] catalog v{self.version}: {len(commands)} commands, {len(link_rows)} client links")
+
+    # ---- lookups (no DB) ----
+
+    def get(self, command_id: int) -> Command | None:
+        return self._commands.get(command_id)
+
+    def is_compatible(self, client_id: str, command_id: int) -> bool:
+        return command_id in self._by_client.get(client_id, ())
+
+    def for_client(self, client_id: str) -> list[Command]:
+        """Enabled, UI-visible commands linked to this client, by name."""
+        ids = self._by_client.get(client_id, ())
+        cmds = [self._commands[i] for i in ids if i in self._commands and self._commands[i].ui_visible]
+        return sorted(cmds, key=lambda c: c.name)
+
+    # ---- invalidation ----
+
+    def request_reload(self, payload: str | None = None) -> None:
+        """NOTIFY callback. Bursts of changes collapse into at most one extra reload."""
+        if self._reload_task is not None and not self._reload_task.done():
+            self._reload_again = True
+            return
+        self._reload_task = asyncio.create_task(self._reload_loop())
+
+    async def _reload_loop(self) -> None:
+        while True:
+            self._reload_again = False
+            try:
+                await self.load()
+            except Exception as e:
+                print(f"[COMMANDS] reload error: {e}")
+            if not self._reload_again:
+                return
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "commands": len(self._commands),
+            "clients": len(self._by_client),
+        }
+
+
+# Global catalog used by the command routes and the alive scheduler
+catalog = CommandCatalog()
@@ -1,3 +1,6 @@
+import socket
+
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -11,6 +14,72 @@ class Settings(BaseSettings):
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
 
+    # Alive liveness policy for clients without alive_mode set:
+    #   "probe"   -> always send the alive probe
+    #   "traffic" -> skip the probe when the client sent any frame within its interval
+    ALIVE_MODE_DEFAULT: str = "probe"
+
+    # Identity of this backend in the clients.owner column: the registry only overwrites
+    # rows it owns (or takes over on connect). Must be stable across restarts.
+    INSTANCE_ID: str = Field(default_factory=socket.gethostname)
+
+    # Max concurrent socket writes for /clients/broadcast
+    BROADCAST_CONCURRENCY: int = 50
+
+    # Default lifetime of commands queued for offline clients
+    OUTBOUND_DEFAULT_TTL_SECONDS: int = 3600
+
+    # messages.raw always keeps the exact frame; also store the decoded text column
+    # (used by SQL-side filters and older readers). Off = decode only at read time.
+    MESSAGES_STORE_TEXT: bool = True
+
+    # Sessions. Sliding expiry: an active session is pushed to NOW + TTL again, but at most
+    # once per renew window, so steady dashboard traffic costs one UPDATE per window.
+    # Expired rows are swept in batches.
+    SESSION_COOKIE: str = "bcontrol_session"
+    SESSION_TTL_HOURS: int = 24
+    SESSION_RENEW_MINUTES: int = 15
+    SESSION_SWEEP_SECONDS: int = 300
+    SESSION_SWEEP_BATCH: int = 1000
+
+    # Validated sessions are reused for a short while instead of querying on every
+    # request. Logout and NOTIFY users_changed / sessions_changed invalidate entries
+    # early; the TTL bounds staleness if a notification is ever missed.
+    SESSION_CACHE_TTL_SECONDS: float = 30
+    SESSION_CACHE_MAX_ENTRIES: int = 10000
+
+    # Login hardening: Argon2 runs in a small thread pool, concurrent logins are capped,
+    # and attempts are rate limited per client IP (every attempt) and per username
+    # (failed attempts only)
+    AUTH_HASH_WORKERS: int = 2
+    LOGIN_MAX_CONCURRENT: int = 4
+    LOGIN_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    LOGIN_IP_BURST: int = 10
+    LOGIN_IP_PER_MINUTE: float = 10
+    LOGIN_USER_BURST: int = 5
+    LOGIN_USER_PER_MINUTE: float = 2
+
+    # Audit log write-behind: queued in memory, COPYed in batches; spilled to a local
+    # JSONL file while the database is unreachable and replayed afterwards
+    AUDIT_QUEUE_MAX: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_SECONDS: float = 0.5
+    AUDIT_FALLBACK_PATH: str = "audit_fallback.jsonl"
+
+    # asyncpg pool. Connections idle longer than DB_POOL_MAX_INACTIVE_SECONDS are closed
+    # (down to DB_POOL_MIN_SIZE). DB_COMMAND_TIMEOUT_SECONDS = 0 means no timeout (startup
+    # migrations in db._init_db may build indexes on large tables).
+    # Each connection keeps up to DB_STATEMENT_CACHE_SIZE prepared statements (app/queries);
+    # set it to 0 behind a transaction-pooling pgbouncer.
+    DB_POOL_MIN_SIZE: int = 2
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_MAX_INACTIVE_SECONDS: float = 300.0
+    DB_COMMAND_TIMEOUT_SECONDS: float = 0
+    DB_STATEMENT_CACHE_SIZE: int = 256
+
+    # Named queries (app/queries) and pool acquire waits at or above this are logged
+    DB_SLOW_QUERY_MS: float = 200.0
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
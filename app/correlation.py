@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable
+
+from .latency import LatencyHistogram
+from .protocol.views import decode_text
+
+
+@dataclass
+class PendingReply:
+    client_id: str
+    command_id: int
+    command_name: str
+    matcher: Callable[[bytes], bool]
+    sent_at: float
+    future: asyncio.Future = field(repr=False)
+    timer: asyncio.TimerHandle | None = field(default=None, repr=False)
+
+
+class ReplyCorrelator:
+    """
+    Outstanding command replies, one FIFO per connected client.
+    handle_client offers every incoming frame to `match` before persisting it: the oldest
+    pending command whose reply predicate accepts the frame gets it, together with the
+    round-trip time. Entries expire after the command's reply timeout and are dropped
+    when the connection closes; waiters then get None.
+    """
+
+    def __init__(self):
+        self._pending: dict[str, deque[PendingReply]] = {}
+        self.rtt: dict[str, LatencyHistogram] = {}   # command name -> RTT
+        self.matched = 0
+        self.timeouts = 0
+        self.dropped = 0
+
+    def expect(self, client_id: str, cmd) -> PendingReply:
+        """Register before writing to the socket so a fast reply cannot be missed."""
+        loop = asyncio.get_running_loop()
+        pending = PendingReply(
+            client_id=client_id,
+            command_id=cmd.id,
+            command_name=cmd.name,
+            matcher=cmd.reply_matcher,
+            sent_at=loop.time(),
+            future=loop.create_future(),
+        )
+        pending.timer = loop.call_later(cmd.reply_timeout, self._expire, pending)
+        self._pending.setdefault(client_id, deque()).append(pending)
+        return pending
+
+    def _remove(self, pending: PendingReply) -> bool:
+        queue = self._pending.get(pending.client_id)
+        if not queue:
+            return False
+        try:
+            queue.remove(pending)
+        except ValueError:
+            return False
+        if not queue:
+            del self._pending[pending.client_id]
+        if pending.timer is not None:
+            pending.timer.cancel()
+        return True
+
+    @staticmethod
+    def _resolve(pending: PendingReply, result: tuple[str, float] | None) -> None:
+        if not pending.future.done():
+            pending.future.set_result(result)
+
+    def _expire(self, pending: PendingReply) -> None:
+        if self._remove(pending):
+            self.timeouts += 1
+            self._resolve(pending, None)
+
+    def cancel(self, pending: PendingReply) -> None:
+        """The send failed: forget the expectation."""
+        if self._remove(pending):
+            self._resolve(pending, None)
+
+    def match(self, client_id: str, frame: bytes) -> PendingReply | None:
+        queue = self._pending.get(client_id)
+        if not queue:
+            return None
+        for pending in queue:
+            if pending.matcher(frame):
+                break
+        else:
+            return None
+
+        self._remove(pending)
+        rtt = asyncio.get_running_loop().time() - pending.sent_at
+        self.rtt.setdefault(pending.command_name, LatencyHistogram()).record(rtt)
+        self.matched += 1
+        self._resolve(pending, (decode_text(frame), rtt))
+        return pending
+
+    def drop(self, client_id: str) -> None:
+        """Connection closed: nothing queued for it can be answered any more."""
+        queue = self._pending.pop(client_id, None)
+        for pending in queue or ():
+            if pending.timer is not None:
+                pending.timer.cancel()
+            self.dropped += 1
+            self._resolve(pending, None)
+
+    async def wait(self, pending: PendingReply) -> tuple[str, float] | None:
+        """(reply, rtt seconds), or None on timeout / disconnect."""
+        try:
+            return await asyncio.shield(pending.future)
+        except asyncio.CancelledError:
+            self.cancel(pending)
+            raise
+
+    def stats(self) -> dict:
+        return {
+            "pending": sum(len(q) for q in self._pending.values()),
+            "matched": self.matched,
+            "timeouts": self.timeouts,
+            "dropped": self.dropped,
+            "rtt": {name: h.summary() for name, h in sorted(self.rtt.items())},
+        }
+
+
+# Global correlator shared by the command routes and handle_client
+correlator = ReplyCorrelator()
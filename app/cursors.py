@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import base64
+import json
+
+from fastapi import HTTPException
+
+
+def encode_cursor(key: tuple) -> str:
+    """Opaque keyset cursor (url-safe base64 JSON of the last row's sort key)."""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return tuple(json.loads(base64.urlsafe_b64decode(padded)))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -2,27 +2,88 @@ from __future__ import annotations
 
 import asyncpg
 import re
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime, UTC
 
 from .config import settings
+from .latency import LatencyHistogram
+from . import queries
 
-db_pool: asyncpg.Pool | None = None
+class InstrumentedPool:
+    """
+    What get_pool() hands out: the asyncpg pool, with acquire() timed (wait for a free
+    connection) and connections in use counted. Everything else is passed through.
+    """
+
+    def __init__(self, pool: asyncpg.Pool):
+        self._pool = pool
+        self.acquire_wait = LatencyHistogram()
+        self.in_use = 0
+        self.max_in_use = 0
+        self.slow_acquires = 0
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+
+    @asynccontextmanager
+    async def acquire(self, *, timeout: float | None = None):
+        busy = self.in_use
+        started = time.perf_counter()
+        async with self._pool.acquire(timeout=timeout) as conn:
+            waited = time.perf_counter() - started
+            self.acquire_wait.record(waited)
+            if waited * 1000 >= settings.DB_SLOW_QUERY_MS:
+                self.slow_acquires += 1
+                print(
+                    f"[DB] waited {waited * 1000:.1f} ms for a connection "
+                    f"({busy}/{self._pool.get_max_size()} in use when requested)"
+                )
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            try:
+                yield conn
+            finally:
+                self.in_use -= 1
+
+    def stats(self) -> dict:
+        return {
+            "size": self._pool.get_size(),
+            "idle": self._pool.get_idle_size(),
+            "max_size": self._pool.get_max_size(),
+            "in_use": self.in_use,
+            "max_in_use": self.max_in_use,
+            "acquire_wait": self.acquire_wait.summary(),
+            "slow_acquires": self.slow_acquires,
+            "queries": queries.query_stats.stats(),
+        }
+
+
+db_pool: InstrumentedPool | None = None
 
 
 async def init_db_pool() -> None:
     """Create global pool and ensure tables exist."""
     global db_pool
-    db_pool = await asyncpg.create_pool(settings.DATABASE_URL, ssl=False)
+    db_pool = InstrumentedPool(await asyncpg.create_pool(
+        settings.DATABASE_URL,
+        ssl=False,
+        min_size=settings.DB_POOL_MIN_SIZE,
+        max_size=settings.DB_POOL_MAX_SIZE,
+        max_inactive_connection_lifetime=settings.DB_POOL_MAX_INACTIVE_SECONDS,
+        command_timeout=settings.DB_COMMAND_TIMEOUT_SECONDS or None,
+        statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+    ))
     await _init_db(db_pool)
 
 
-def get_pool() -> asyncpg.Pool:
+def get_pool() -> InstrumentedPool:
     if db_pool is None:
         raise RuntimeError("DB pool not initialized. Call init_db_pool() first.")
     return db_pool
 
 
-async def _init_db(pool: asyncpg.Pool) -> None:
+async def _init_db(pool: InstrumentedPool) -> None:
     async with pool.acquire() as conn:
         # Whitelist
         await conn.execute(
@@ -35,6 +96,47 @@ async def _init_db(pool: asyncpg.Pool) -> None:
             """
         )
 
+        # Alive-probe config per whitelisted client (read by the alive scheduler)
+        await conn.execute(
+            """
+            ALTER TABLE allowed_clients
+                ADD COLUMN IF NOT EXISTS alive_enabled BOOLEAN NOT NULL DEFAULT FALSE,
+                ADD COLUMN IF NOT EXISTS alive_command_id INTEGER,
+                ADD COLUMN IF NOT EXISTS alive_expected_response TEXT,
+                ADD COLUMN IF NOT EXISTS alive_interval_seconds INTEGER,
+                ADD COLUMN IF NOT EXISTS alive_timeout_seconds INTEGER,
+                ADD COLUMN IF NOT EXISTS alive_mode TEXT;   -- 'probe' | 'traffic' | NULL (settings default)
+            """
+        )
+
+        # Brand decoder per client (app/decoders); NULL = store frames only
+        await conn.execute(
+            """
+            ALTER TABLE allowed_clients ADD COLUMN IF NOT EXISTS decoder TEXT;
+            """
+        )
+
+        # NOTIFY on whitelist changes so in-memory state reloads just that client
+        await conn.execute(
+            """
+            CREATE OR REPLACE FUNCTION notify_allowed_clients_changed() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    PERFORM pg_notify('allowed_clients_changed', OLD.client_id);
+                ELSE
+                    PERFORM pg_notify('allowed_clients_changed', NEW.client_id);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS trg_allowed_clients_notify ON allowed_clients;
+            CREATE TRIGGER trg_allowed_clients_notify
+                AFTER INSERT OR UPDATE OR DELETE ON allowed_clients
+                FOR EACH ROW EXECUTE FUNCTION notify_allowed_clients_changed();
+            """
+        )
+
         # Clients
         await conn.execute(
             """
@@ -55,6 +157,20 @@ async def _init_db(pool: asyncpg.Pool) -> None:
             ADD COLUMN IF NOT EXISTS alive_status TEXT;
             """
         )
+        # Row version, bumped on every change so dashboards can patch only changed rows
+        await conn.execute(
+            """
+            ALTER TABLE clients
+            ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0;
+            """
+        )
+        # Instance holding the panel's socket (settings.INSTANCE_ID); guards registry writes
+        await conn.execute(
+            """
+            ALTER TABLE clients
+            ADD COLUMN IF NOT EXISTS owner TEXT;
+            """
+        )
 
         # Messages / events
         await conn.execute(
@@ -74,6 +190,35 @@ async def _init_db(pool: asyncpg.Pool) -> None:
             """
         )
 
+        # Exact frame bytes; the text column becomes an optional decoded copy
+        await conn.execute(
+            """
+            ALTER TABLE messages ADD COLUMN IF NOT EXISTS raw BYTEA;
+            ALTER TABLE messages ALTER COLUMN message DROP NOT NULL;
+            """
+        )
+
+        # Alive-probe round-trip summaries, one row per client per persist window
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS alive_latency (
+                id           BIGSERIAL PRIMARY KEY,
+                client_id    TEXT NOT NULL,
+                period_start TIMESTAMPTZ NOT NULL,
+                period_end   TIMESTAMPTZ NOT NULL,
+                samples      INTEGER NOT NULL,
+                p50_ms       DOUBLE PRECISION,
+                p95_ms       DOUBLE PRECISION,
+                p99_ms       DOUBLE PRECISION,
+                max_ms       DOUBLE PRECISION,
+                buckets      JSONB             -- sparse log-linear histogram {bucket: count}
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_alive_latency_client_period
+                ON alive_latency (client_id, period_end DESC);
+            """
+        )
+
         # Ignored message patterns
         await conn.execute(
             """
@@ -107,7 +252,45 @@ async def _init_db(pool: asyncpg.Pool) -> None:
             created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
             expires_at TIMESTAMPTZ NOT NULL
             );
+
+            -- expiry filter / sweeper, and per-user lookups (logout-all, ON DELETE CASCADE)
+            CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at);
+            CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions (user_id);
             """)
+
+        # NOTIFY so every instance drops cached sessions (auth_session.SessionCache):
+        #   users_changed    -> user id, when a user is deactivated / changes role / is deleted
+        #   sessions_changed -> sha256(token) hex, when a session row is deleted
+        await conn.execute(
+            """
+            CREATE OR REPLACE FUNCTION notify_users_changed() RETURNS trigger AS $$
+            BEGIN
+                PERFORM pg_notify('users_changed', OLD.id::text);
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS trg_users_notify ON users;
+            CREATE TRIGGER trg_users_notify
+                AFTER UPDATE OF active, role, password_hash OR DELETE ON users
+                FOR EACH ROW EXECUTE FUNCTION notify_users_changed();
+
+            CREATE OR REPLACE FUNCTION notify_sessions_changed() RETURNS trigger AS $$
+            BEGIN
+                -- expired rows (the sweeper) are never served from cache: nothing to tell
+                IF OLD.expires_at > NOW() THEN
+                    PERFORM pg_notify('sessions_changed', encode(sha256(convert_to(OLD.token, 'UTF8')), 'hex'));
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS trg_sessions_notify ON sessions;
+            CREATE TRIGGER trg_sessions_notify
+                AFTER DELETE ON sessions
+                FOR EACH ROW EXECUTE FUNCTION notify_sessions_changed();
+            """
+        )
         
         # Audit logs
         await conn.execute("""
@@ -129,9 +312,72 @@ async def _init_db(pool: asyncpg.Pool) -> None:
             remote_ip TEXT,
             user_agent TEXT
             );
-
-            CREATE INDEX IF NOT EXISTS idx_audit_log_ts ON audit_log (ts DESC);
             """)
+
+        # Audit query API (/audit): keyset on (ts, id). Each filter column leads an index
+        # that ends in (ts DESC, id DESC), so a filtered page is an index range scan with
+        # no sort; the (column, action, ...) pairs serve "action X by user/panel Y".
+        await conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_audit_log_ts_id
+                ON audit_log (ts DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS idx_audit_log_action_ts
+                ON audit_log (action, ts DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS idx_audit_log_username_ts
+                ON audit_log (username, ts DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS idx_audit_log_user_id_ts
+                ON audit_log (user_id, ts DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS idx_audit_log_client_ts
+                ON audit_log (client_id, ts DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS idx_audit_log_client_action_ts
+                ON audit_log (client_id, action, ts DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS idx_audit_log_user_action_ts
+                ON audit_log (username, action, ts DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS idx_audit_log_failed_ts
+                ON audit_log (ts DESC, id DESC) WHERE success = FALSE;
+            DROP INDEX IF EXISTS idx_audit_log_ts;  -- superseded by idx_audit_log_ts_id
+            """
+        )
+
+        # Daily per-action counts, maintained per INSERT/COPY statement from the transition
+        # table (one upsert per audit batch, not per row)
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS audit_daily_counts (
+                day     DATE NOT NULL,          -- UTC day
+                action  TEXT NOT NULL,
+                success BOOLEAN NOT NULL,
+                count   BIGINT NOT NULL,
+                PRIMARY KEY (day, action, success)
+            );
+
+            CREATE OR REPLACE FUNCTION audit_daily_count() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO audit_daily_counts (day, action, success, count)
+                SELECT (ts AT TIME ZONE 'UTC')::date, action, success, COUNT(*)
+                FROM new_rows
+                GROUP BY 1, 2, 3
+                ON CONFLICT (day, action, success)
+                DO UPDATE SET count = audit_daily_counts.count + EXCLUDED.count;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS trg_audit_daily_count ON audit_log;
+            CREATE TRIGGER trg_audit_daily_count
+                AFTER INSERT ON audit_log
+                REFERENCING NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION audit_daily_count();
+
+            -- first run on an existing audit_log: backfill once
+            INSERT INTO audit_daily_counts (day, action, success, count)
+            SELECT (ts AT TIME ZONE 'UTC')::date, action, success, COUNT(*)
+            FROM audit_log
+            WHERE NOT EXISTS (SELECT 1 FROM audit_daily_counts)
+            GROUP BY 1, 2, 3
+            ON CONFLICT DO NOTHING;
+            """
+        )
         
         await conn.execute(
             """CREATE TABLE IF NOT EXISTS tcp_commands (
@@ -177,13 +423,136 @@ async def _init_db(pool: asyncpg.Pool) -> None:
                 ON DELETE CASCADE
             );""")
 
+        await conn.execute(
+            """
+            ALTER TABLE tcp_commands
+            ADD COLUMN IF NOT EXISTS ui_visible BOOLEAN NOT NULL DEFAULT TRUE;
+            """
+        )
+
+        # Optional trailer computed over the rendered payload (before CR/LF/NUL)
+        await conn.execute(
+            """
+            ALTER TABLE tcp_commands
+            ADD COLUMN IF NOT EXISTS checksum TEXT CHECK (
+                checksum IN ('crc16_modbus', 'crc_ccitt', 'xor', 'lrc', 'sum8')
+            );
+            """
+        )
+
+        # Expected reply for request/response commands (NULL pattern = no reply expected)
+        await conn.execute(
+            """
+            ALTER TABLE tcp_commands
+            ADD COLUMN IF NOT EXISTS reply_pattern TEXT,
+            ADD COLUMN IF NOT EXISTS reply_match TEXT NOT NULL DEFAULT 'prefix' CHECK (
+                reply_match IN ('prefix', 'regex', 'exact')
+            ),
+            ADD COLUMN IF NOT EXISTS reply_timeout_ms INTEGER NOT NULL DEFAULT 5000;
+            """
+        )
+
+        # NOTIFY on command / compatibility changes so the in-memory catalog reloads
+        await conn.execute(
+            """
+            CREATE OR REPLACE FUNCTION notify_commands_changed() RETURNS trigger AS $$
+            BEGIN
+                PERFORM pg_notify('commands_changed', TG_TABLE_NAME);
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS trg_tcp_commands_notify ON tcp_commands;
+            CREATE TRIGGER trg_tcp_commands_notify
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON tcp_commands
+                FOR EACH STATEMENT EXECUTE FUNCTION notify_commands_changed();
+
+            DROP TRIGGER IF EXISTS trg_client_commands_notify ON client_commands;
+            CREATE TRIGGER trg_client_commands_notify
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON client_commands
+                FOR EACH STATEMENT EXECUTE FUNCTION notify_commands_changed();
+            """
+        )
+
+        # Durable queue for commands issued while a panel is offline
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS outbound_queue (
+                id BIGSERIAL PRIMARY KEY,
+                client_id TEXT NOT NULL
+                    REFERENCES allowed_clients (client_id) ON DELETE CASCADE,
+                command_id INTEGER
+                    REFERENCES tcp_commands (id) ON DELETE SET NULL,
+                command_name TEXT,               -- snapshot at enqueue time
+                payload BYTEA NOT NULL,          -- rendered bytes, sent as-is
+                dedup_key TEXT,
+                status TEXT NOT NULL DEFAULT 'pending' CHECK (
+                    status IN ('pending', 'delivered', 'expired', 'cancelled')
+                ),
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created_by TEXT,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                expires_at TIMESTAMPTZ NOT NULL,
+                delivered_at TIMESTAMPTZ
+            );
+
+            -- reconnect path: pending items of one client, in order
+            CREATE INDEX IF NOT EXISTS idx_outbound_queue_pending
+                ON outbound_queue (client_id, id) WHERE status = 'pending';
+
+            -- expiry sweeper
+            CREATE INDEX IF NOT EXISTS idx_outbound_queue_pending_expiry
+                ON outbound_queue (expires_at) WHERE status = 'pending';
+
+            -- at most one pending item per dedup key
+            CREATE UNIQUE INDEX IF NOT EXISTS uq_outbound_queue_dedup
+                ON outbound_queue (client_id, dedup_key)
+                WHERE status = 'pending' AND dedup_key IS NOT NULL;
+            """
+        )
+
+        # Structured events decoded from panel frames
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS events (
+                id          BIGSERIAL PRIMARY KEY,
+                message_id  BIGINT REFERENCES messages (id) ON DELETE SET NULL,
+                client_id   TEXT NOT NULL,
+                ts          TIMESTAMPTZ NOT NULL,
+                decoder     TEXT NOT NULL,
+                event_type  TEXT NOT NULL,      -- normalized: fire_alarm, burglary_alarm, trouble, ...
+                code        TEXT NOT NULL,      -- brand code as received
+                account     TEXT,
+                partition   INTEGER,
+                zone        INTEGER,
+                user_no     INTEGER,
+                restore     BOOLEAN NOT NULL DEFAULT FALSE
+            );
+
+            -- every index ends in (ts DESC, id DESC): the /panel-events keyset order
+            -- "all fire alarms on zone 12"
+            CREATE INDEX IF NOT EXISTS idx_events_type_zone_ts_id
+                ON events (event_type, zone, ts DESC, id DESC);
+            -- one panel's history
+            CREATE INDEX IF NOT EXISTS idx_events_client_ts_id
+                ON events (client_id, ts DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS idx_events_ts_id
+                ON events (ts DESC, id DESC);
+            DROP INDEX IF EXISTS idx_events_type_zone_ts;
+            DROP INDEX IF EXISTS idx_events_client_ts;
+            DROP INDEX IF EXISTS idx_events_ts;
+            """
+        )
+
 # ---- Shared helpers (can be reused in routes if needed) ----
 
 async def is_client_id_allowed(client_id: str) -> bool:
     pool = get_pool()
     async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT 1 FROM allowed_clients WHERE client_id = $1",
+        row = await queries.fetchrow(
+            conn,
+            "client_allowed",
             client_id,
         )
         return row is not None
@@ -197,11 +566,9 @@ async def insert_system_message(
 ) -> None:
     pool = get_pool()
     async with pool.acquire() as conn:
-        await conn.execute(
-            """
-            INSERT INTO messages (client_id, timestamp, direction, message, remote_ip, remote_port)
-            VALUES ($1, $2, 'system', $3, $4, $5);
-            """,
+        await queries.execute(
+            conn,
+            "insert_system_message",
             client_id,
             datetime.now(UTC),
             message,
@@ -212,21 +579,34 @@ async def insert_system_message(
 async def get_client_description(client_id: str) -> str | None:
     pool = get_pool()
     async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT description FROM allowed_clients WHERE client_id = $1",
+        row = await queries.fetchrow(
+            conn,
+            "client_description",
             client_id,
         )
         return row["description"] if row else None
 
-async def should_ignore_message(message: str) -> bool:
-    """
-    Check if a message matches any active ignore pattern.
-    pattern_type:
-      - exact:       message == pattern
-      - startswith:  message.startswith(pattern)
-      - contains:    pattern in message
-      - regex:       re.search(pattern, message) is not None
-    """
+# Messages the dashboard never shows (panel banners / noise)
+DASHBOARD_HIDDEN_MESSAGES = ("#NFS640.027.001", "SERIAL NUMBER = 0010365116", "- ")
+
+# Active ignore patterns are cached briefly so per-message checks stay off the DB
+IGNORE_PATTERNS_TTL_SECONDS = 5.0
+_ignore_patterns: list[tuple[str, str]] = []
+_ignore_patterns_loaded_at = 0.0
+
+# Live-feed visibility of incoming frames, memoized by frame_key (panels repeat the same
+# frames); valid until the ignore patterns are reloaded
+_visible_by_key: dict[bytes, bool] = {}
+VISIBLE_CACHE_MAX = 4096
+
+
+async def _get_ignore_patterns() -> list[tuple[str, str]]:
+    global _ignore_patterns, _ignore_patterns_loaded_at
+
+    now = time.monotonic()
+    if now - _ignore_patterns_loaded_at < IGNORE_PATTERNS_TTL_SECONDS:
+        return _ignore_patterns
+
     pool = get_pool()
     async with pool.acquire() as conn:
         rows = await conn.fetch(
@@ -237,10 +617,28 @@ async def should_ignore_message(message: str) -> bool:
             """
         )
 
-    for r in rows:
-        ptype = r["pattern_type"]
-        pat = r["pattern"]
+    _ignore_patterns = [(r["pattern_type"], r["pattern"]) for r in rows]
+    _ignore_patterns_loaded_at = now
+    _visible_by_key.clear()
+    return _ignore_patterns
+
+
+def invalidate_ignore_patterns() -> None:
+    global _ignore_patterns_loaded_at
+    _ignore_patterns_loaded_at = 0.0
+    _visible_by_key.clear()
 
+
+async def should_ignore_message(message: str) -> bool:
+    """
+    Check if a message matches any active ignore pattern.
+    pattern_type:
+      - exact:       message == pattern
+      - startswith:  message.startswith(pattern)
+      - contains:    pattern in message
+      - regex:       re.search(pattern, message) is not None
+    """
+    for ptype, pat in await _get_ignore_patterns():
         if ptype == "exact" and message == pat:
             return True
         if ptype == "startswith" and message.startswith(pat):
@@ -251,3 +649,26 @@ async def should_ignore_message(message: str) -> bool:
             return True
 
     return False
+
+
+async def is_dashboard_visible(message: str) -> bool:
+    """Same filter /logs applies: hidden banners and ignore patterns are not shown."""
+    if message in DASHBOARD_HIDDEN_MESSAGES:
+        return False
+    return not await should_ignore_message(message)
+
+
+def cached_frame_visibility(key: bytes) -> bool | None:
+    """Memoized is_dashboard_visible for a frame_key, or None if it must be computed."""
+    if time.monotonic() - _ignore_patterns_loaded_at >= IGNORE_PATTERNS_TTL_SECONDS:
+        return None  # patterns due for a reload
+    return _visible_by_key.get(key)
+
+
+async def frame_visibility(key: bytes, message: str) -> bool:
+    """is_dashboard_visible for an incoming frame; the result is cached by its frame_key."""
+    visible = await is_dashboard_visible(message)
+    if len(_visible_by_key) >= VISIBLE_CACHE_MAX:
+        _visible_by_key.clear()
+    _visible_by_key[key] = visible
+    return visible
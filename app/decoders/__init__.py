@@ -0,0 +1,17 @@
+# app/decoders/__init__.py
+#
+# Brand-specific frame decoders. Each module registers its decoder on import; a client
+# uses the one named in allowed_clients.decoder.
+
+from .base import DecodedEvent, Decoder, available, get_decoder, register
+from . import cid_binary, contact_id, notifier, sia  # noqa: F401  (registration)
+from .assignments import assignments
+
+__all__ = [
+    "DecodedEvent",
+    "Decoder",
+    "assignments",
+    "available",
+    "get_decoder",
+    "register",
+]
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+
+from ..db import get_pool
+from .base import Decoder, get_decoder
+
+
+class DecoderAssignments:
+    """
+    client_id -> decoder, from allowed_clients.decoder. Loaded once at startup and
+    refreshed per client on NOTIFY allowed_clients_changed (all clients when the
+    listener reconnects), so the ingest path never queries for it.
+    """
+
+    def __init__(self):
+        self._by_client: dict[str, Decoder] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, client_ids: list[str] | None = None) -> None:
+        pool = get_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT client_id, decoder
+                FROM allowed_clients
+                WHERE ($1::text[] IS NULL OR client_id = ANY($1::text[]));
+                """,
+                client_ids,
+            )
+
+        found = {r["client_id"]: get_decoder(r["decoder"]) for r in rows}
+        if client_ids is None:
+            self._by_client = {cid: d for cid, d in found.items() if d is not None}
+        else:
+            for cid in client_ids:
+                decoder = found.get(cid)
+                if decoder is None:
+                    self._by_client.pop(cid, None)
+                else:
+                    self._by_client[cid] = decoder
+
+    def get(self, client_id: str) -> Decoder | None:
+        return self._by_client.get(client_id)
+
+    def request_reload(self, payload: str | None) -> None:
+        """NOTIFY callback: payload is a client_id, or None for everything."""
+        task = asyncio.create_task(self._reload(None if payload is None else [payload]))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _reload(self, client_ids: list[str] | None) -> None:
+        try:
+            await self.load(client_ids)
+        except Exception as e:
+            print(f"[DECODERS] reload error: {e}")
+
+    def stats(self) -> dict:
+        counts: dict[str, int] = {}
+        for decoder in self._by_client.values():
+            counts[decoder.name] = counts.get(decoder.name, 0) + 1
+        return counts
+
+
+# Global per-client decoder selection used by handle_client
+assignments = DecoderAssignments()
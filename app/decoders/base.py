@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class DecodedEvent:
+    """One structured event extracted from a panel frame (a row of the events table)."""
+    event_type: str                 # normalized: fire_alarm, burglary_alarm, trouble, arm, ...
+    code: str                       # brand code as received: "E130", "FA", "FIRE ALARM"
+    account: str | None = None
+    partition: int | None = None
+    zone: int | None = None
+    user_no: int | None = None
+    restore: bool = False           # restore / clear of an earlier event
+
+    def to_dict(self) -> dict:
+        return {
+            "event_type": self.event_type,
+            "code": self.code,
+            "account": self.account,
+            "partition": self.partition,
+            "zone": self.zone,
+            "user_no": self.user_no,
+            "restore": self.restore,
+        }
+
+
+class Decoder:
+    """
+    Base class for brand decoders. `decode` receives the frame bytes exactly as read from
+    the socket (binary formats may contain NULs) and returns the events it contains; an
+    empty list means "not a frame this decoder understands". Patterns / struct formats
+    are compiled at import so decoding is a match plus a few lookups.
+    """
+
+    name: str = ""
+    description: str = ""
+
+    def decode(self, frame: bytes) -> list[DecodedEvent]:
+        raise NotImplementedError
+
+
+_DECODERS: dict[str, Decoder] = {}
+
+
+def register(decoder_cls: type[Decoder]) -> type[Decoder]:
+    """Class decorator: instantiate and register a decoder under its `name`."""
+    decoder = decoder_cls()
+    if not decoder.name:
+        raise ValueError(f"{decoder_cls.__name__} has no name")
+    if decoder.name in _DECODERS:
+        raise ValueError(f"Duplicate decoder name: {decoder.name}")
+    _DECODERS[decoder.name] = decoder
+    return decoder_cls
+
+
+def get_decoder(name: str | None) -> Decoder | None:
+    return _DECODERS.get(name) if name else None
+
+
+def available() -> list[dict]:
+    return [{"name": d.name, "description": d.description} for d in _DECODERS.values()]
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import struct
+
+from ..protocol.checksums import sum8
+from .base import DecodedEvent, Decoder, register
+from .contact_id import EVENT_TYPES, FAMILIES, OPEN_CLOSE_PREFIX
+
+# Packed binary Contact ID, fixed 11-byte records (several may share one TCP read):
+#   [0] 0x02 | [1-2] account u16 BE | [3] qualifier u8 | [4-5] event code u16 BE
+#   (BCD-free, e.g. 130) | [6] partition u8 | [7-8] zone/user u16 BE
+#   | [9] sum8 of bytes 1..8 | [10] 0x03
+RECORD = struct.Struct(">BHBHBHB")   # without the trailing ETX
+STX, ETX = 0x02, 0x03
+SIZE = RECORD.size + 1
+
+
+@register
+class ContactIdBinaryDecoder(Decoder):
+    name = "cid_binary"
+    description = "Contact ID packed in 11-byte binary records (STX ... sum8 ETX)"
+
+    def decode(self, frame: bytes) -> list[DecodedEvent]:
+        events = []
+        pos = frame.find(STX)
+        while pos != -1 and pos + SIZE <= len(frame):
+            if frame[pos + SIZE - 1] != ETX:
+                pos = frame.find(STX, pos + 1)
+                continue
+            _stx, account, q, code, partition, number, checksum = RECORD.unpack_from(frame, pos)
+            if sum8(frame[pos + 1:pos + SIZE - 2]) != checksum:
+                pos = frame.find(STX, pos + 1)
+                continue
+
+            code_str = f"{code:03d}"
+            restore = q == 3
+            prefix = "R" if restore else "E"
+            if code_str.startswith(OPEN_CLOSE_PREFIX):
+                events.append(DecodedEvent(
+                    event_type="arm" if restore else "disarm",
+                    code=prefix + code_str,
+                    account=f"{account:04X}",
+                    partition=partition,
+                    user_no=number,
+                ))
+            else:
+                events.append(DecodedEvent(
+                    event_type=EVENT_TYPES.get(code_str) or FAMILIES.get(code_str[0], "unknown"),
+                    code=prefix + code_str,
+                    account=f"{account:04X}",
+                    partition=partition,
+                    zone=number,
+                    restore=restore,
+                ))
+            pos = frame.find(STX, pos + SIZE)
+        return events
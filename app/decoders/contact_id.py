@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import re
+
+from .base import DecodedEvent, Decoder, register
+
+# Ademco Contact ID as printed by receivers / IP modules:
+#   ACCT MT Q EEE GG ZZZ   e.g. "1234 18 1 130 01 012"  (spaces optional)
+# MT 18/98 = message type, Q 1 = new event/opening, 3 = restore/closing, 6 = status,
+# EEE = event code, GG = partition, ZZZ = zone or user number.
+FRAME_RE = re.compile(rb"([0-9A-Fa-f]{4})\s*(18|98)\s*([136])\s*(\d{3})\s*(\d{2})\s*(\d{3})")
+
+# event code -> normalized type (families fall back on the first digit(s) below)
+EVENT_TYPES = {
+    "100": "medical", "101": "medical",
+    "110": "fire_alarm", "111": "fire_alarm", "112": "fire_alarm", "113": "fire_alarm",
+    "114": "fire_alarm", "115": "fire_alarm", "116": "fire_alarm", "117": "fire_alarm",
+    "118": "fire_alarm",
+    "120": "panic", "121": "duress", "122": "panic", "123": "panic",
+    "130": "burglary_alarm", "131": "burglary_alarm", "132": "burglary_alarm",
+    "133": "burglary_alarm", "134": "burglary_alarm", "135": "burglary_alarm",
+    "137": "tamper", "144": "tamper", "145": "tamper",
+    "150": "supervisory", "200": "supervisory",
+    "301": "ac_loss", "302": "low_battery", "309": "low_battery",
+    "350": "communication_trouble", "354": "communication_trouble",
+    "570": "bypass", "573": "bypass",
+    "602": "test", "603": "test",
+}
+
+# 4xx open/close: the number is a user, qualifier 1 = opening (disarm), 3 = closing (arm)
+OPEN_CLOSE_PREFIX = "4"
+
+FAMILIES = {"1": "alarm", "2": "supervisory", "3": "trouble", "5": "bypass", "6": "test"}
+
+
+@register
+class ContactIdDecoder(Decoder):
+    name = "contact_id"
+    description = "Ademco Contact ID (ACCT 18 Q EEE GG ZZZ), text"
+
+    def decode(self, frame: bytes) -> list[DecodedEvent]:
+        events = []
+        for m in FRAME_RE.finditer(frame):
+            account, _mt, q, code, partition, number = (g.decode("ascii") for g in m.groups())
+            restore = q == "3"
+            if code.startswith(OPEN_CLOSE_PREFIX):
+                events.append(DecodedEvent(
+                    event_type="arm" if restore else "disarm",
+                    code=("R" if restore else "E") + code,
+                    account=account,
+                    partition=int(partition),
+                    user_no=int(number),
+                ))
+                continue
+            events.append(DecodedEvent(
+                event_type=EVENT_TYPES.get(code) or FAMILIES.get(code[0], "unknown"),
+                code=("R" if restore else "E") + code,
+                account=account,
+                partition=int(partition),
+                zone=int(number),
+                restore=restore,
+            ))
+        return events
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import re
+
+from .base import DecodedEvent, Decoder, register
+
+# Notifier fire panels (NFS-320/640/...) print one line per event on their serial port:
+#   "FIRE ALARM  SMOKE (PHOTO) 3RD FLOOR  10:15A 031224 L1D012"
+#   "TROUBLE     ... Z005"
+# The status keyword comes first; the device address is L<loop><D|M><address>, zones Z<nnn>.
+STATUS_RE = re.compile(
+    rb"^(FIRE ALARM|ALARM|TROUBLE|SUPERVISORY|SUPERVSRY|SECURITY|CLEARED (?:ALARM|TROUBLE|SUPERVISORY)|"
+    rb"CLR TBL|CLR SUP|DISABLED|ACKNOWLEDGE|SYSTEM NORMAL|SYSTEM RESET)\b"
+)
+DEVICE_RE = re.compile(rb"\bL(\d{1,2})([DM])(\d{1,3})\b")
+ZONE_RE = re.compile(rb"\bZ(\d{1,3})\b")
+
+# status -> (event_type, restore)
+STATUSES = {
+    b"FIRE ALARM": ("fire_alarm", False),
+    b"ALARM": ("fire_alarm", False),
+    b"TROUBLE": ("trouble", False),
+    b"SUPERVISORY": ("supervisory", False),
+    b"SUPERVSRY": ("supervisory", False),
+    b"SECURITY": ("burglary_alarm", False),
+    b"CLEARED ALARM": ("fire_alarm", True),
+    b"CLEARED TROUBLE": ("trouble", True),
+    b"CLEARED SUPERVISORY": ("supervisory", True),
+    b"CLR TBL": ("trouble", True),
+    b"CLR SUP": ("supervisory", True),
+    b"DISABLED": ("bypass", False),
+    b"ACKNOWLEDGE": ("acknowledge", False),
+    b"SYSTEM NORMAL": ("system_normal", True),
+    b"SYSTEM RESET": ("system_reset", False),
+}
+
+
+@register
+class NotifierDecoder(Decoder):
+    name = "notifier"
+    description = "Notifier fire panels, serial printer lines (FIRE ALARM ... L1D012)"
+
+    def decode(self, frame: bytes) -> list[DecodedEvent]:
+        frame = frame.lstrip(b"\x00\r\n\t ")
+        status = STATUS_RE.match(frame)
+        if status is None:
+            return []
+        event_type, restore = STATUSES[status.group(1)]
+
+        code = status.group(1).decode("ascii")
+        device = DEVICE_RE.search(frame, status.end())
+        if device is not None:
+            # point address has no zone column of its own; keep it with the code
+            code += " " + device.group(0).decode("ascii")
+        z = ZONE_RE.search(frame, status.end())
+
+        return [DecodedEvent(
+            event_type=event_type,
+            code=code,
+            zone=int(z.group(1)) if z is not None else None,
+            restore=restore,
+        )]
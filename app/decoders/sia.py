@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import re
+
+from .base import DecodedEvent, Decoder, register
+
+# SIA DC-03 data blocks as forwarded in text:
+#   #ACCT|N[ri<partition>/]<CC><nnn>[/<CC><nnn>...]   e.g. "#1234|Nri1/FA012/BA003"
+BLOCK_RE = re.compile(rb"#([0-9A-Fa-f]{3,6})\|N((?:ri\d+/)?[A-Z]{2}\d*(?:/(?:ri\d+/)?[A-Z]{2}\d*)*)")
+ITEM_RE = re.compile(rb"(?:ri(\d+)/)?([A-Z]{2})(\d*)")
+
+# code -> (event_type, restore, number is a user rather than a zone)
+CODES = {
+    "FA": ("fire_alarm", False, False), "FR": ("fire_alarm", True, False),
+    "FT": ("trouble", False, False), "FJ": ("trouble", True, False),
+    "BA": ("burglary_alarm", False, False), "BR": ("burglary_alarm", True, False),
+    "PA": ("panic", False, False), "PR": ("panic", True, False),
+    "HA": ("duress", False, False), "HR": ("duress", True, False),
+    "MA": ("medical", False, False), "MR": ("medical", True, False),
+    "TA": ("tamper", False, False), "TR": ("tamper", True, False),
+    "SS": ("supervisory", False, False), "SR": ("supervisory", True, False),
+    "AT": ("ac_loss", False, False), "AR": ("ac_loss", True, False),
+    "YT": ("low_battery", False, False), "YR": ("low_battery", True, False),
+    "YC": ("communication_trouble", False, False), "YK": ("communication_trouble", True, False),
+    "BB": ("bypass", False, False), "BU": ("bypass", True, False),
+    "OP": ("disarm", False, True), "CL": ("arm", False, True),
+    "RP": ("test", False, False),
+}
+
+
+@register
+class SiaDecoder(Decoder):
+    name = "sia"
+    description = "SIA DC-03 data blocks (#ACCT|Nri1/FA012), text"
+
+    def decode(self, frame: bytes) -> list[DecodedEvent]:
+        events = []
+        for block in BLOCK_RE.finditer(frame):
+            account = block.group(1).decode("ascii")
+            partition = None
+            for item in ITEM_RE.finditer(block.group(2)):
+                if item.group(1):
+                    partition = int(item.group(1))  # applies to the following items too
+                code = item.group(2).decode("ascii")
+                number = int(item.group(3)) if item.group(3) else None
+                event_type, restore, is_user = CODES.get(code, ("unknown", False, False))
+                events.append(DecodedEvent(
+                    event_type=event_type,
+                    code=code,
+                    account=account,
+                    partition=partition,
+                    zone=None if is_user else number,
+                    user_no=number if is_user else None,
+                    restore=restore,
+                ))
+        return events
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import deque
+from datetime import datetime
+
+# How many recent events we keep for Last-Event-ID resume
+EVENT_HISTORY_SIZE = 1000
+# Per-dashboard backlog; a slow screen that overflows it gets a single resync instead
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class Subscriber:
+    """
+    One open /events stream. Bounded queue; on overflow the backlog is replaced by one
+    resync frame, so the dashboard reloads state instead of silently missing updates.
+    """
+
+    def __init__(self, maxlen: int = SUBSCRIBER_QUEUE_SIZE):
+        self.maxlen = maxlen
+        self.queue: deque[bytes] = deque()
+        self.dropped = 0
+        self.resyncs = 0
+        self._wakeup = asyncio.Event()
+
+    def push(self, frame: bytes) -> bool:
+        """Queue a frame; False (nothing queued) when the backlog is full."""
+        if len(self.queue) >= self.maxlen:
+            return False
+        self.queue.append(frame)
+        self._wakeup.set()
+        return True
+
+    def resync(self, frame: bytes) -> None:
+        """Drop the backlog (and the frame that did not fit) in favour of a resync frame."""
+        self.dropped += len(self.queue) + 1
+        self.resyncs += 1
+        self.queue.clear()
+        self.queue.append(frame)
+        self._wakeup.set()
+
+    async def next_batch(self, timeout: float) -> list[bytes]:
+        """Wait up to `timeout` seconds and return every queued frame."""
+        if not self.queue:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        frames = list(self.queue)
+        self.queue.clear()
+        return frames
+
+
+class EventHub:
+    """
+    Single in-process broadcaster.
+    Each event is serialized once and the same bytes are handed to every subscriber,
+    so publishing costs no DB work and no per-screen encoding.
+    """
+
+    def __init__(self, history_size: int = EVENT_HISTORY_SIZE):
+        self._seq = 0
+        self._history: deque[tuple[int, bytes]] = deque(maxlen=history_size)
+        self._subscribers: set[Subscriber] = set()
+        self.published = 0
+
+    @property
+    def last_id(self) -> int:
+        return self._seq
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def publish(self, event_type: str, data: dict) -> int:
+        self._seq += 1
+        payload = json.dumps(data, default=_json_default, separators=(",", ":"))
+        frame = f"id: {self._seq}\nevent: {event_type}\ndata: {payload}\n\n".encode()
+
+        self._history.append((self._seq, frame))
+        for sub in self._subscribers:
+            if not sub.push(frame):
+                sub.resync(self._resync_frame())
+
+        self.published += 1
+        return self._seq
+
+    def subscribe(self, last_event_id: int | None = None) -> Subscriber:
+        """
+        Register a new stream. If the client sends Last-Event-ID we replay what it missed,
+        or tell it to resync when the id is outside our history (gap or server restart).
+        """
+        sub = Subscriber()
+
+        if last_event_id is not None:
+            oldest = self._history[0][0] if self._history else self._seq + 1
+            if last_event_id > self._seq or last_event_id < oldest - 1:
+                sub.push(self._resync_frame())
+            else:
+                for seq, frame in self._history:
+                    if seq > last_event_id and not sub.push(frame):
+                        sub.resync(self._resync_frame())
+                        break
+
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self._subscribers.discard(sub)
+
+    def stats(self) -> dict:
+        return {
+            "last_id": self._seq,
+            "published": self.published,
+            "subscribers": len(self._subscribers),
+            "dropped": sum(s.dropped for s in self._subscribers),
+            "resyncs": sum(s.resyncs for s in self._subscribers),
+        }
+
+    def _resync_frame(self) -> bytes:
+        return f"id: {self._seq}\nevent: resync\ndata: {{}}\n\n".encode()
+
+
+# Global hub fed by tcp_server and poller
+hub = EventHub()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+# Log-linear (HDR-style) histogram: values below 2*SUB_BUCKETS are exact, above that every
+# power of two is split into SUB_BUCKETS linear slots, so the relative error stays ~3% at any
+# magnitude while a whole distribution fits in a few dozen sparse counters.
+SUB_BITS = 4
+SUB_BUCKETS = 1 << SUB_BITS       # 16
+LINEAR_LIMIT = SUB_BUCKETS * 2    # 32
+
+
+def bucket_index(value: int) -> int:
+    if value < LINEAR_LIMIT:
+        return value
+    shift = value.bit_length() - SUB_BITS - 1
+    return LINEAR_LIMIT + (shift - 1) * SUB_BUCKETS + ((value >> shift) - SUB_BUCKETS)
+
+
+def bucket_bounds(index: int) -> tuple[int, int]:
+    """Inclusive [low, high] of the values that land in `index`."""
+    if index < LINEAR_LIMIT:
+        return index, index
+    k = index - LINEAR_LIMIT
+    shift = k // SUB_BUCKETS + 1
+    sub = k % SUB_BUCKETS + SUB_BUCKETS
+    return sub << shift, ((sub + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Latency samples recorded in microseconds, reported in milliseconds."""
+
+    __slots__ = ("counts", "count", "total_us", "min_us", "max_us")
+
+    def __init__(self):
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: int | None = None
+        self.max_us: int | None = None
+
+    def record(self, seconds: float) -> None:
+        us = max(int(seconds * 1_000_000), 0)
+        idx = bucket_index(us)
+        self.counts[idx] = self.counts.get(idx, 0) + 1
+        self.count += 1
+        self.total_us += us
+        self.min_us = us if self.min_us is None else min(self.min_us, us)
+        self.max_us = us if self.max_us is None else max(self.max_us, us)
+
+    def percentile(self, p: float) -> float | None:
+        """Value (ms) at percentile p (0-100); midpoint of the matching bucket."""
+        if not self.count:
+            return None
+        rank = max(1, round(p / 100 * self.count))
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= rank:
+                low, high = bucket_bounds(idx)
+                value = min((low + high) / 2, self.max_us)
+                return round(value / 1000, 3)
+        return round(self.max_us / 1000, 3)
+
+    def summary(self) -> dict:
+        if not self.count:
+            return {"count": 0, "p50_ms": None, "p95_ms": None, "p99_ms": None,
+                    "min_ms": None, "max_ms": None, "mean_ms": None}
+        return {
+            "count": self.count,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "min_ms": round(self.min_us / 1000, 3),
+            "max_ms": round(self.max_us / 1000, 3),
+            "mean_ms": round(self.total_us / self.count / 1000, 3),
+        }
+
+    def buckets(self) -> dict[str, int]:
+        """Sparse {bucket index: count}, for persistence."""
+        return {str(k): v for k, v in sorted(self.counts.items())}
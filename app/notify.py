@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Callable
+
+import asyncpg
+
+from .config import settings
+
+RECONNECT_SECONDS = 5
+
+# channel -> callbacks(payload). payload is None after a reconnect, meaning
+# "notifications may have been missed, reload everything".
+_handlers: dict[str, list[Callable[[str | None], None]]] = {}
+
+
+def on_notify(channel: str, handler: Callable[[str | None], None]) -> None:
+    """Register a callback for a Postgres NOTIFY channel (call before run_listener starts)."""
+    _handlers.setdefault(channel, []).append(handler)
+
+
+def _dispatch(channel: str, payload: str | None) -> None:
+    for handler in _handlers.get(channel, []):
+        try:
+            handler(payload)
+        except Exception as e:
+            print(f"[NOTIFY] handler error on {channel}: {e}")
+
+
+def _on_notification(conn, pid, channel, payload) -> None:
+    _dispatch(channel, payload)
+
+
+async def run_listener() -> None:
+    """Keep one dedicated connection LISTENing on every registered channel."""
+    first = True
+    while True:
+        conn = None
+        try:
+            conn = await asyncpg.connect(settings.DATABASE_URL, ssl=False)
+            for channel in _handlers:
+                await conn.add_listener(channel, _on_notification)
+
+            if not first:
+                for channel in _handlers:
+                    _dispatch(channel, None)
+            first = False
+
+            # asyncpg delivers notifications in the background; just ping the connection
+            while True:
+                await asyncio.sleep(RECONNECT_SECONDS)
+                await conn.execute("SELECT 1")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[NOTIFY] listener error: {e}")
+        finally:
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+
+        await asyncio.sleep(RECONNECT_SECONDS)
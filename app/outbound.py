@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, UTC
+from typing import Awaitable, Callable
+
+from .db import get_pool
+from . import queries
+from .events import hub
+
+SWEEP_SECONDS = 60
+
+SendFn = Callable[[str, bytes], Awaitable[object]]
+
+
+class OutboundQueue:
+    """
+    Durable per-client command queue (table outbound_queue) for panels that are offline
+    when a command is issued. Items are delivered in id order when the client registers
+    again; pending items past expires_at become 'expired' instead. A pending item with the
+    same (client_id, dedup_key) is refreshed rather than queued twice.
+    """
+
+    def __init__(self):
+        self._locks: dict[str, asyncio.Lock] = {}
+        self.delivered = 0
+        self.expired = 0
+
+    async def enqueue(
+        self,
+        client_id: str,
+        *,
+        command_id: int | None,
+        command_name: str | None,
+        payload: bytes,
+        ttl_seconds: int,
+        dedup_key: str | None,
+        created_by: str | None,
+    ) -> tuple[int, bool]:
+        """Returns (queue id, True if a new row was inserted / False if deduplicated)."""
+        expires_at = datetime.now(UTC) + timedelta(seconds=ttl_seconds)
+        pool = get_pool()
+        async with pool.acquire() as conn:
+            row = await queries.fetchrow(
+                conn,
+                "enqueue_outbound",
+                client_id,
+                command_id,
+                command_name,
+                payload,
+                dedup_key,
+                expires_at,
+                created_by,
+            )
+        hub.publish("outbound", {"id": row["id"], "client_id": client_id, "status": "pending"})
+        return row["id"], row["inserted"]
+
+    async def deliver_pending(self, client_id: str, send: SendFn) -> int:
+        """
+        Flush the client's queue in order. Stops at the first failed send (the client
+        dropped again); the rest stays pending for the next registration.
+        """
+        # reconnect and a fresh enqueue may both trigger a flush; never run two at once
+        async with self._locks.setdefault(client_id, asyncio.Lock()):
+            return await self._deliver(client_id, send)
+
+    async def _deliver(self, client_id: str, send: SendFn) -> int:
+        pool = get_pool()
+        async with pool.acquire() as conn:
+            # one round trip: expire stale items, fetch the live ones (partial index)
+            rows = await queries.fetch(
+                conn,
+                "pending_outbound",
+                client_id,
+            )
+        if not rows:
+            return 0
+        self.expired += rows[0]["expired"]
+
+        delivered = 0
+        for r in rows:
+            try:
+                await send(client_id, bytes(r["payload"]))
+            except Exception as e:
+                async with pool.acquire() as conn:
+                    await queries.execute(
+                        conn,
+                        "outbound_failed",
+                        r["id"],
+                        str(e),
+                    )
+                print(f"[OUTBOUND] delivery to {client_id} stopped at #{r['id']}: {e}")
+                break
+
+            # marked one by one: a crash mid-flush must not resend what already went out
+            async with pool.acquire() as conn:
+                await queries.execute(
+                    conn,
+                    "outbound_delivered",
+                    r["id"],
+                )
+            delivered += 1
+            hub.publish("outbound", {"id": r["id"], "client_id": client_id, "status": "delivered"})
+
+        self.delivered += delivered
+        if delivered:
+            print(f"[OUTBOUND] delivered {delivered} queued command(s) to {client_id}")
+        return delivered
+
+    async def cancel(self, item_id: int) -> bool:
+        pool = get_pool()
+        async with pool.acquire() as conn:
+            client_id = await queries.fetchval(
+                conn,
+                "cancel_outbound",
+                item_id,
+            )
+        if client_id is None:
+            return False
+        hub.publish("outbound", {"id": item_id, "client_id": client_id, "status": "cancelled"})
+        return True
+
+    async def run_sweeper(self) -> None:
+        """Expire items of clients that never come back."""
+        while True:
+            await asyncio.sleep(SWEEP_SECONDS)
+            try:
+                pool = get_pool()
+                async with pool.acquire() as conn:
+                    n = await queries.fetchval(
+                        conn,
+                        "expire_outbound"
+                    )
+                self.expired += n
+            except Exception as e:
+                print(f"[OUTBOUND] sweep error: {e}")
+
+    def stats(self) -> dict:
+        return {"delivered": self.delivered, "expired": self.expired}
+
+
+# Global queue used by handle_client and the command routes
+outbound = OutboundQueue()
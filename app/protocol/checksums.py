@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from typing import Callable
+
+# All CRCs are table driven: the 256-entry tables are built once at import time, so
+# each byte costs one lookup + shift/xor instead of eight bit iterations.
+
+
+def _reflected_table(poly: int) -> tuple[int, ...]:
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ poly if crc & 1 else crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+
+def _msb_table(poly: int) -> tuple[int, ...]:
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ poly) & 0xFFFF if crc & 0x8000 else (crc << 1) & 0xFFFF
+        table.append(crc)
+    return tuple(table)
+
+
+_MODBUS_TABLE = _reflected_table(0xA001)   # 0x8005 reflected
+_CCITT_TABLE = _msb_table(0x1021)
+
+
+def crc16_modbus(data: bytes) -> int:
+    crc = 0xFFFF
+    table = _MODBUS_TABLE
+    for b in data:
+        crc = (crc >> 8) ^ table[(crc ^ b) & 0xFF]
+    return crc
+
+
+def crc_ccitt(data: bytes) -> int:
+    """CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF, no reflection)."""
+    crc = 0xFFFF
+    table = _CCITT_TABLE
+    for b in data:
+        crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ b]
+    return crc
+
+
+def xor8(data: bytes) -> int:
+    x = 0
+    for b in data:
+        x ^= b
+    return x
+
+
+def sum8(data: bytes) -> int:
+    return sum(data) & 0xFF
+
+
+def lrc8(data: bytes) -> int:
+    """Modbus LRC: two's complement of the 8-bit sum."""
+    return (-sum(data)) & 0xFF
+
+
+# name -> function returning the trailer bytes in wire order
+CHECKSUMS: dict[str, Callable[[bytes], bytes]] = {
+    "crc16_modbus": lambda d: crc16_modbus(d).to_bytes(2, "little"),
+    "crc_ccitt": lambda d: crc_ccitt(d).to_bytes(2, "big"),
+    "xor": lambda d: bytes((xor8(d),)),
+    "lrc": lambda d: bytes((lrc8(d),)),
+    "sum8": lambda d: bytes((sum8(d),)),
+}
+
+
+def checksum_trailer(name: str, data: bytes) -> bytes:
+    try:
+        fn = CHECKSUMS[name]
+    except KeyError:
+        raise ValueError(f"Unsupported checksum: {name}") from None
+    return fn(data)
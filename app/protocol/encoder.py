@@ -1,35 +1,30 @@
-import base64
+from .template import CompiledTemplate, compile_template
 
-def build_payload(cmd: dict) -> bytes:
+
+def compile_command(cmd: dict) -> CompiledTemplate:
     """
-    Build raw bytes to send over TCP based on command definition.
+    Compile a command definition into a reusable template.
     cmd keys expected:
-      - payload (str)
+      - payload (str), may contain typed placeholders like {register:u16} / {count:u16=2}
       - encoding: ascii | hex | base64
+      - checksum: None | crc16_modbus | crc_ccitt | xor | lrc | sum8 (optional)
       - append_null, append_cr, append_lf (bool)
+    The checksum covers the rendered body; CR/LF/NUL are appended after it.
     """
-
-    encoding = cmd["encoding"]
-    payload = cmd["payload"]
-
-    if encoding == "ascii":
-        data = payload.encode("ascii", errors="strict")
-
-    elif encoding == "hex":
-        # Accept formats like: "01 03 00 00 00 02" or "010300000002"
-        data = bytes.fromhex(payload.replace(" ", ""))
-
-    elif encoding == "base64":
-        data = base64.b64decode(payload)
-
-    else:
-        raise ValueError(f"Unsupported encoding: {encoding}")
-
+    suffix = b""
     if cmd.get("append_cr"):
-        data += b"\r"
+        suffix += b"\r"
     if cmd.get("append_lf"):
-        data += b"\n"
+        suffix += b"\n"
     if cmd.get("append_null"):
-        data += b"\x00"
+        suffix += b"\x00"
+
+    return compile_template(cmd["payload"], cmd["encoding"], cmd.get("checksum"), suffix)
+
 
-    return data
+def build_payload(cmd: dict, params: dict | None = None) -> bytes:
+    """
+    Build raw bytes to send over TCP based on command definition.
+    One-shot helper; long-lived callers should keep the compiled template instead.
+    """
+    return compile_command(cmd).render(params)
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import base64
+import re
+from dataclasses import dataclass
+
+from .checksums import CHECKSUMS
+
+# Placeholders look like {register:u16} or {count:u16=2}. In hex templates they become
+# fixed-width binary fields; in ascii templates they are written as decimal text.
+PLACEHOLDER_RE = re.compile(r"\{(\w+):(\w+)(?:=(0x[0-9a-fA-F]+|\d+))?\}")
+
+# type -> (width in bytes, byte order)
+FIELD_TYPES: dict[str, tuple[int, str]] = {
+    "u8": (1, "big"),
+    "u16": (2, "big"),
+    "u16le": (2, "little"),
+    "u32": (4, "big"),
+    "u32le": (4, "little"),
+}
+
+
+@dataclass(frozen=True)
+class Field:
+    name: str
+    type: str
+    default: int | None
+    binary: bool
+
+    def encode(self, value) -> bytes:
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(f"Parameter {self.name!r} must be an integer")
+        width, order = FIELD_TYPES[self.type]
+        if not 0 <= value < 1 << (8 * width):
+            raise ValueError(f"Parameter {self.name!r} out of range for {self.type}: {value}")
+        if self.binary:
+            return value.to_bytes(width, order)
+        return str(value).encode("ascii")
+
+
+class CompiledTemplate:
+    """
+    A command payload split once into literal byte runs and typed fields, plus the
+    checksum and CR/LF/NUL trailer. Rendering is a join, a checksum and a concat.
+    """
+
+    __slots__ = ("parts", "fields", "checksum", "_checksum_fn", "suffix", "static")
+
+    def __init__(self, parts: list, checksum: str | None, suffix: bytes):
+        self.parts = tuple(parts)
+        self.fields = {p.name: p for p in parts if isinstance(p, Field)}
+        self.checksum = checksum
+        self._checksum_fn = CHECKSUMS[checksum] if checksum else None
+        self.suffix = suffix
+        # fully rendered payload when no parameter is required
+        self.static: bytes | None = None
+        if all(f.default is not None for f in self.fields.values()):
+            self.static = self.render()
+
+    @property
+    def required(self) -> list[str]:
+        return [f.name for f in self.fields.values() if f.default is None]
+
+    def render(self, params: dict | None = None) -> bytes:
+        if params is None:
+            if self.static is not None:
+                return self.static
+            params = {}
+        else:
+            unknown = params.keys() - self.fields.keys()
+            if unknown:
+                raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+
+        chunks = []
+        for part in self.parts:
+            if isinstance(part, Field):
+                value = params.get(part.name, part.default)
+                if value is None:
+                    raise ValueError(f"Missing parameter: {part.name}")
+                chunks.append(part.encode(value))
+            else:
+                chunks.append(part)
+        body = b"".join(chunks)
+
+        if self._checksum_fn is not None:
+            body += self._checksum_fn(body)
+        return body + self.suffix
+
+
+def _literal(text: str, encoding: str) -> bytes:
+    if encoding == "ascii":
+        return text.encode("ascii", errors="strict")
+    if encoding == "hex":
+        # Accept formats like: "01 03 00 00 00 02" or "010300000002"
+        return bytes.fromhex("".join(text.split()))
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def _parse_default(text: str) -> int:
+    """Placeholder default: 0x-prefixed hex, else decimal (zero padding allowed: "01" -> 1)."""
+    return int(text, 16) if text[:2].lower() == "0x" else int(text, 10)
+
+
+def compile_template(
+    payload: str,
+    encoding: str,
+    checksum: str | None = None,
+    suffix: bytes = b"",
+) -> CompiledTemplate:
+    if checksum and checksum not in CHECKSUMS:
+        raise ValueError(f"Unsupported checksum: {checksum}")
+
+    if encoding == "base64":
+        # opaque binary: no placeholders possible
+        return CompiledTemplate([base64.b64decode(payload)], checksum, suffix)
+    if encoding not in ("ascii", "hex"):
+        raise ValueError(f"Unsupported encoding: {encoding}")
+
+    parts: list = []
+    seen: set[str] = set()
+    pos = 0
+    for m in PLACEHOLDER_RE.finditer(payload):
+        name, ftype, default = m.group(1), m.group(2), m.group(3)
+        if ftype not in FIELD_TYPES:
+            raise ValueError(f"Unsupported field type: {ftype}")
+        if name in seen:
+            raise ValueError(f"Duplicate parameter: {name}")
+        seen.add(name)
+
+        parts.append(_literal(payload[pos:m.start()], encoding))
+        field = Field(name, ftype, _parse_default(default) if default else None, encoding == "hex")
+        if field.default is not None:
+            field.encode(field.default)  # reject out-of-range defaults at compile time
+        parts.append(field)
+        pos = m.end()
+    parts.append(_literal(payload[pos:], encoding))
+
+    # merge adjacent literal runs and drop empty ones
+    merged: list = []
+    for part in parts:
+        if isinstance(part, bytes):
+            if not part:
+                continue
+            if merged and isinstance(merged[-1], bytes):
+                merged[-1] += part
+                continue
+        merged.append(part)
+
+    return CompiledTemplate(merged, checksum, suffix)
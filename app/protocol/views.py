@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import base64
+from typing import Literal
+
+View = Literal["text", "hex", "base64"]
+
+# Panels send BEL when the sirens go off; the text view spells it out
+BEL_TEXT = b"SIRENAS ACTIVADAS"
+
+
+def frame_key(raw: bytes) -> bytes:
+    """Bytes used for matching alive answers / replies: NULs dropped, whitespace trimmed."""
+    return raw.replace(b"\x00", b"").strip()
+
+
+def decode_text(raw: bytes) -> str:
+    """Human-readable view of a frame (what used to be stored in messages.message)."""
+    data = raw.replace(b"\x00", b"").replace(b"\x07", BEL_TEXT)
+    return data.decode(errors="replace").strip()
+
+
+def render(raw: bytes | None, text: str | None, view: View) -> str | None:
+    """
+    Decode one stored message for display. `raw` is messages.raw (None for rows written
+    before it existed and for system messages), `text` is messages.message.
+    """
+    if raw is None:
+        if text is None or view == "text":
+            return text
+        raw = text.encode()
+    if view == "hex":
+        return raw.hex(" ")
+    if view == "base64":
+        return base64.b64encode(raw).decode("ascii")
+    return text if text is not None else decode_text(raw)
@@ -0,0 +1,298 @@
+"""
+Hot SQL statements, each defined once under a name.
+
+Call sites run them with `await queries.fetchval(conn, "insert_incoming_message", ...)`
+instead of inlining the text. Because each name always sends the same SQL string,
+asyncpg's per-connection statement cache (DB_STATEMENT_CACHE_SIZE) prepares it once per
+pooled connection and then only binds parameters. The cache also re-prepares
+transparently after schema changes, which hand-held PreparedStatement objects would not.
+
+Every call is timed per name (query_stats, shown by GET /metrics/queries); statements
+slower than DB_SLOW_QUERY_MS are logged. SQL built at runtime (dynamic filters in the
+routers) goes through fetch_sql() under a fixed name so it is timed the same way. One-off
+loads and DDL in db._init_db stay inline.
+"""
+from __future__ import annotations
+
+import time
+from typing import Literal
+
+from .config import settings
+from .latency import LatencyHistogram
+
+STATEMENTS: dict[str, str] = {
+    # ---- messages / events (TCP ingest) ----
+    "insert_incoming_message": """
+        INSERT INTO messages (client_id, timestamp, direction, message, raw)
+        VALUES ($1, $2, 'incoming', $3, $4)
+        RETURNING id;
+    """,
+    "insert_outgoing_message": """
+        INSERT INTO messages (client_id, timestamp, direction, message, raw)
+        VALUES ($1, $2, 'outgoing', $3, $4);
+    """,
+    "insert_outgoing_messages": """
+        INSERT INTO messages (client_id, timestamp, direction, message, raw)
+        SELECT c, t, 'outgoing', $3::text, $4::bytea
+        FROM unnest($1::text[], $2::timestamptz[]) AS u(c, t);
+    """,
+    "insert_system_message": """
+        INSERT INTO messages (client_id, timestamp, direction, message, remote_ip, remote_port)
+        VALUES ($1, $2, 'system', $3, $4, $5);
+    """,
+    "insert_events": """
+        INSERT INTO events
+          (message_id, client_id, ts, decoder, event_type, code, account, partition, zone, user_no, restore)
+        SELECT $1::bigint, $2::text, $3::timestamptz, $4::text, e, c, a, p, z, u, r
+        FROM unnest($5::text[], $6::text[], $7::text[], $8::int[], $9::int[], $10::int[], $11::bool[])
+             AS x(e, c, a, p, z, u, r);
+    """,
+
+    # ---- dashboard ----
+    "dashboard_logs": """
+        SELECT
+            m.id,
+            m.client_id,
+            a.description,
+            m.direction,
+            m.message,
+            m.raw,
+            m.timestamp,
+            m.remote_ip,
+            m.remote_port
+        FROM messages m
+        LEFT JOIN allowed_clients a
+            ON m.client_id = a.client_id
+        WHERE m.direction = 'incoming'
+          AND (m.message IS NULL OR m.message <> ALL($2::text[]))
+          AND m.id > $3
+        ORDER BY m.timestamp DESC
+        LIMIT $1;
+    """,
+
+    # ---- allowed clients ----
+    "client_allowed": "SELECT 1 FROM allowed_clients WHERE client_id = $1;",
+    "client_description": "SELECT description FROM allowed_clients WHERE client_id = $1;",
+    "alive_targets": """
+        SELECT
+            ac.client_id,
+            ac.alive_expected_response,
+            ac.alive_interval_seconds,
+            ac.alive_timeout_seconds,
+            ac.alive_mode,
+            ac.alive_command_id
+        FROM allowed_clients ac
+        WHERE ac.alive_enabled = TRUE
+          AND ac.alive_command_id IS NOT NULL
+          AND ($1::text[] IS NULL OR ac.client_id = ANY($1::text[]));
+    """,
+
+    # ---- registry write-behind / alive latency ----
+    "upsert_clients": """
+        INSERT INTO clients
+            (client_id, ip, port, status, alive_status, connected_at, last_seen, version, owner)
+        SELECT c, i, p, s, a, ca, ls, v, $9::text
+        FROM unnest(
+            $1::text[], $2::inet[], $3::int[], $4::text[],
+            $5::text[], $6::timestamptz[], $7::timestamptz[], $8::bigint[]
+        ) AS u(c, i, p, s, a, ca, ls, v)
+        ON CONFLICT (client_id) DO UPDATE
+        SET ip = EXCLUDED.ip,
+            port = EXCLUDED.port,
+            status = EXCLUDED.status,
+            alive_status = EXCLUDED.alive_status,
+            connected_at = EXCLUDED.connected_at,
+            last_seen = EXCLUDED.last_seen,
+            version = EXCLUDED.version,
+            owner = EXCLUDED.owner
+        -- another instance's row is only taken over by a new connection
+        WHERE clients.owner IS NULL
+           OR clients.owner = EXCLUDED.owner
+           OR EXCLUDED.status = 'connected';
+    """,
+    "touch_clients": """
+        UPDATE clients AS c
+        SET last_seen = a.last_seen
+        FROM unnest($1::text[], $2::timestamptz[]) AS a(client_id, last_seen)
+        WHERE c.client_id = a.client_id
+          AND (c.last_seen IS NULL OR c.last_seen < a.last_seen);
+    """,
+    "insert_alive_latency": """
+        INSERT INTO alive_latency
+            (client_id, period_start, period_end, samples, p50_ms, p95_ms, p99_ms, max_ms, buckets)
+        SELECT c, $2, $3, n, p50, p95, p99, mx, b::jsonb
+        FROM unnest(
+            $1::text[], $4::int[], $5::float8[], $6::float8[],
+            $7::float8[], $8::float8[], $9::text[]
+        ) AS t(c, n, p50, p95, p99, mx, b);
+    """,
+
+    # ---- sessions ----
+    "session_user": """
+        SELECT u.id, u.username, u.role, s.expires_at
+        FROM sessions s
+        JOIN users u ON u.id = s.user_id
+        WHERE s.token = $1
+          AND s.expires_at > NOW()
+          AND u.active = TRUE;
+    """,
+    "insert_session": """
+        INSERT INTO sessions (user_id, token, expires_at)
+        VALUES ($1, $2, $3);
+    """,
+    "delete_session": "DELETE FROM sessions WHERE token = $1;",
+    "renew_session": """
+        UPDATE sessions
+        SET expires_at = $2
+        WHERE token = $1 AND expires_at > NOW();
+    """,
+    "sweep_sessions": """
+        WITH doomed AS (
+            SELECT id FROM sessions
+            WHERE expires_at <= NOW()
+            ORDER BY expires_at
+            LIMIT $1
+            FOR UPDATE SKIP LOCKED
+        ), gone AS (
+            DELETE FROM sessions s USING doomed d
+            WHERE s.id = d.id
+            RETURNING 1
+        )
+        SELECT COUNT(*) FROM gone;
+    """,
+    "count_sessions": """
+        SELECT COUNT(*) AS sessions, COUNT(DISTINCT user_id) AS users
+        FROM sessions
+        WHERE expires_at > NOW();
+    """,
+
+    # ---- outbound queue ----
+    "enqueue_outbound": """
+        INSERT INTO outbound_queue
+          (client_id, command_id, command_name, payload, dedup_key, expires_at, created_by)
+        VALUES ($1, $2, $3, $4, $5, $6, $7)
+        ON CONFLICT (client_id, dedup_key) WHERE status = 'pending' AND dedup_key IS NOT NULL
+        DO UPDATE SET payload = EXCLUDED.payload,
+                      expires_at = EXCLUDED.expires_at,
+                      created_by = EXCLUDED.created_by
+        RETURNING id, (xmax = 0) AS inserted;
+    """,
+    "pending_outbound": """
+        WITH expired AS (
+            UPDATE outbound_queue
+            SET status = 'expired'
+            WHERE client_id = $1 AND status = 'pending' AND expires_at <= NOW()
+            RETURNING id
+        )
+        SELECT id, payload, (SELECT COUNT(*) FROM expired) AS expired
+        FROM outbound_queue
+        WHERE client_id = $1 AND status = 'pending' AND expires_at > NOW()
+        ORDER BY id;
+    """,
+    "outbound_failed": """
+        UPDATE outbound_queue
+        SET attempts = attempts + 1, last_error = $2
+        WHERE id = $1;
+    """,
+    "outbound_delivered": """
+        UPDATE outbound_queue
+        SET status = 'delivered', delivered_at = NOW(), attempts = attempts + 1
+        WHERE id = $1;
+    """,
+    "cancel_outbound": """
+        UPDATE outbound_queue
+        SET status = 'cancelled'
+        WHERE id = $1 AND status = 'pending'
+        RETURNING client_id;
+    """,
+    "expire_outbound": """
+        WITH expired AS (
+            UPDATE outbound_queue
+            SET status = 'expired'
+            WHERE status = 'pending' AND expires_at <= NOW()
+            RETURNING 1
+        )
+        SELECT COUNT(*) FROM expired;
+    """,
+}
+
+
+QuerySort = Literal["total", "mean", "p99", "max", "count"]
+
+
+class QueryStats:
+    """Per-name latency histograms (cumulative since start) and error counts."""
+
+    def __init__(self):
+        self._latency: dict[str, LatencyHistogram] = {}
+        self._errors: dict[str, int] = {}
+        self.slow = 0
+
+    def record(self, name: str, seconds: float, ok: bool) -> None:
+        hist = self._latency.get(name)
+        if hist is None:
+            hist = self._latency[name] = LatencyHistogram()
+        hist.record(seconds)
+        if not ok:
+            self._errors[name] = self._errors.get(name, 0) + 1
+        ms = seconds * 1000
+        if ms >= settings.DB_SLOW_QUERY_MS:
+            self.slow += 1
+            print(f"[DB] slow query {name}: {ms:.1f} ms")
+
+    def top(self, limit: int = 20, sort: QuerySort = "total") -> list[dict]:
+        rows = [
+            {
+                "name": name,
+                "total_ms": round(hist.total_us / 1000, 3),
+                "errors": self._errors.get(name, 0),
+                **hist.summary(),
+            }
+            for name, hist in self._latency.items()
+        ]
+        key = {"total": "total_ms", "mean": "mean_ms", "p99": "p99_ms", "max": "max_ms", "count": "count"}[sort]
+        rows.sort(key=lambda r: r[key] or 0, reverse=True)
+        return rows[:limit]
+
+    def stats(self) -> dict:
+        return {
+            "statements": len(self._latency),
+            "calls": sum(h.count for h in self._latency.values()),
+            "errors": sum(self._errors.values()),
+            "slow": self.slow,
+        }
+
+
+query_stats = QueryStats()
+
+
+async def _run(conn, method: str, name: str, sql: str, args: tuple):
+    started = time.perf_counter()
+    ok = False
+    try:
+        result = await getattr(conn, method)(sql, *args)
+        ok = True
+        return result
+    finally:
+        query_stats.record(name, time.perf_counter() - started, ok)
+
+
+async def execute(conn, name: str, *args) -> str:
+    return await _run(conn, "execute", name, STATEMENTS[name], args)
+
+
+async def fetch(conn, name: str, *args) -> list:
+    return await _run(conn, "fetch", name, STATEMENTS[name], args)
+
+
+async def fetchrow(conn, name: str, *args):
+    return await _run(conn, "fetchrow", name, STATEMENTS[name], args)
+
+
+async def fetchval(conn, name: str, *args):
+    return await _run(conn, "fetchval", name, STATEMENTS[name], args)
+
+
+async def fetch_sql(conn, name: str, sql: str, *args) -> list:
+    """fetch() for SQL assembled at runtime, timed under `name`."""
+    return await _run(conn, "fetch", name, sql, args)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import time
+
+# Idle buckets are dropped once they are full again; at most this many are kept anyway
+MAX_BUCKETS = 50_000
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, capacity: float):
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+
+class KeyedLimiter:
+    """
+    One token bucket per key (IP, username, ...): `capacity` attempts in a burst,
+    refilled at `per_second`. Buckets are created on first use and forgotten when full.
+    """
+
+    def __init__(self, capacity: float, per_second: float):
+        self.capacity = capacity
+        self.per_second = per_second
+        self._buckets: dict[str, TokenBucket] = {}
+        self.limited = 0
+
+    def _refill(self, key: str, now: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= MAX_BUCKETS:
+                self._prune(now)
+            bucket = self._buckets[key] = TokenBucket(self.capacity)
+        else:
+            bucket.tokens = min(self.capacity, bucket.tokens + (now - bucket.updated) * self.per_second)
+        bucket.updated = now
+        return bucket
+
+    def _prune(self, now: float) -> None:
+        full_after = self.capacity / self.per_second if self.per_second > 0 else float("inf")
+        for key in [k for k, b in self._buckets.items() if now - b.updated >= full_after]:
+            del self._buckets[key]
+        if len(self._buckets) >= MAX_BUCKETS:
+            # still full of active keys: drop the oldest half rather than grow without bound
+            oldest = sorted(self._buckets, key=lambda k: self._buckets[k].updated)
+            for key in oldest[: len(oldest) // 2]:
+                del self._buckets[key]
+
+    def retry_after(self, key: str) -> float:
+        """0 if one token is available now, else seconds until it will be (nothing consumed)."""
+        bucket = self._refill(key, time.monotonic())
+        if bucket.tokens >= 1:
+            return 0.0
+        self.limited += 1
+        return (1 - bucket.tokens) / self.per_second if self.per_second > 0 else float("inf")
+
+    def consume(self, key: str) -> None:
+        bucket = self._refill(key, time.monotonic())
+        bucket.tokens = max(bucket.tokens - 1, 0.0)
+
+    def take(self, key: str) -> float:
+        """retry_after + consume in one step: 0 means allowed (and charged)."""
+        wait = self.retry_after(key)
+        if wait == 0:
+            self._buckets[key].tokens -= 1
+        return wait
+
+    def stats(self) -> dict:
+        return {"keys": len(self._buckets), "limited": self.limited}
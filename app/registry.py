@@ -0,0 +1,381 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+from dataclasses import dataclass, asdict
+from datetime import datetime, UTC
+
+from .config import settings
+from .db import get_pool
+from . import queries
+from .events import hub
+
+FLUSH_INTERVAL_SECONDS = 1.0  # how often dirty client rows are written back
+ACTIVITY_FLUSH_SECONDS = 5.0  # how often last_seen of active clients is written back
+
+
+@dataclass
+class ClientState:
+    client_id: str
+    description: str | None = None
+    ip: str | None = None
+    port: int | None = None
+    status: str | None = None
+    alive_status: str | None = None
+    connected_at: datetime | None = None
+    last_seen: datetime | None = None
+    version: int = 0
+
+    # counters since process start
+    connects: int = 0
+    messages_in: int = 0
+    messages_out: int = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+# Sort keys for ClientRegistry.query(); client_id breaks ties so keyset cursors are unique
+SORT_KEYS = {
+    "client_id": lambda s: (s.client_id,),
+    "description": lambda s: ((s.description or "").lower(), s.client_id),
+    "status": lambda s: (s.status or "", s.client_id),
+    "last_seen": lambda s: (s.last_seen.timestamp() if s.last_seen else 0.0, s.client_id),
+}
+
+
+class ClientRegistry:
+    """
+    Authoritative in-memory state of every known client.
+    Mutations bump the row version, publish an event and mark the row dirty;
+    dirty rows are written to the clients table in one batched statement per flush.
+    """
+
+    def __init__(self):
+        self._clients: dict[str, ClientState] = {}
+        self._dirty: set[str] = set()
+        # client_id -> last inbound frame time since the previous activity flush
+        self._activity: dict[str, datetime] = {}
+        self._activity_flushed_at = 0.0
+
+        # secondary indexes for /clients filtering and O(1) counts
+        self._sorted_ids: list[str] = []
+        self._by_status: dict[str | None, set[str]] = {}
+        self._by_alive: dict[str | None, set[str]] = {}
+        self.flushes = 0
+        self.rows_flushed = 0
+
+    async def load(self) -> None:
+        pool = get_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT
+                    c.client_id,
+                    c.ip,
+                    c.port,
+                    c.status,
+                    c.alive_status,
+                    c.connected_at,
+                    c.last_seen,
+                    c.version,
+                    c.owner,
+                    a.description
+                FROM clients c
+                LEFT JOIN allowed_clients a
+                    ON c.client_id = a.client_id;
+                """
+            )
+
+        self._clients = {
+            r["client_id"]: ClientState(
+                client_id=r["client_id"],
+                description=r["description"],
+                ip=str(r["ip"]) if r["ip"] is not None else None,
+                port=r["port"],
+                status=r["status"],
+                alive_status=r["alive_status"],
+                connected_at=r["connected_at"],
+                last_seen=r["last_seen"],
+                version=r["version"],
+            )
+            for r in rows
+        }
+
+        self._sorted_ids = sorted(self._clients)
+        self._by_status = {}
+        self._by_alive = {}
+        for state in self._clients.values():
+            self._by_status.setdefault(state.status, set()).add(state.client_id)
+            self._by_alive.setdefault(state.alive_status, set()).add(state.client_id)
+
+        # loaded before the TCP server starts, so no socket is held here yet: "connected"
+        # rows we (or nobody) own are leftovers of a crash/restart. Rows owned by another
+        # instance are its live panels and stay as they are.
+        stale = [
+            r["client_id"] for r in rows
+            if r["status"] == "connected" and r["owner"] in (None, settings.INSTANCE_ID)
+        ]
+        for client_id in stale:
+            self.update(client_id, status="disconnected", alive_status=None)
+
+        print(f"[REGISTRY] loaded {len(self._clients)} clients ({len(stale)} stale connections reset)")
+
+    # ---- reads ----
+
+    def get(self, client_id: str) -> ClientState | None:
+        return self._clients.get(client_id)
+
+    def all(self) -> list[ClientState]:
+        return list(self._clients.values())
+
+    def online(self) -> list[ClientState]:
+        return [s for s in self._clients.values() if s.status == "connected"]
+
+    def counts(self) -> dict:
+        """Fleet totals straight from the indexes (no scan)."""
+        total = len(self._clients)
+        online = len(self._by_status.get("connected", ()))
+        return {
+            "total": total,
+            "online": online,
+            "offline": total - online,
+            "pending": len(self._by_alive.get("pending", ())),
+            "alive": {
+                (k if k is not None else "unknown"): len(v)
+                for k, v in self._by_alive.items() if v
+            },
+        }
+
+    def query(
+        self,
+        *,
+        status: str | None = None,
+        alive_status: str | None = None,
+        search: str | None = None,
+        sort: str = "client_id",
+        descending: bool = False,
+        after: tuple | None = None,
+        limit: int | None = None,
+    ) -> tuple[list[ClientState], tuple | None]:
+        """
+        Filter / sort / keyset-paginate clients.
+        Returns (page, cursor of the last row or None when there are no more rows).
+        """
+        if status is not None:
+            ids = self._by_status.get(status, set())
+        else:
+            ids = None
+        if alive_status is not None:
+            alive_ids = self._by_alive.get(alive_status, set())
+            ids = alive_ids if ids is None else ids & alive_ids
+
+        if ids is None:
+            # no index filter: walk in client_id order
+            candidates = [self._clients[cid] for cid in self._sorted_ids]
+        else:
+            candidates = [self._clients[cid] for cid in ids]
+
+        if search:
+            needle = search.lower()
+            candidates = [
+                s for s in candidates
+                if needle in s.client_id.lower() or needle in (s.description or "").lower()
+            ]
+
+        key = SORT_KEYS[sort]
+        if ids is not None or sort != "client_id" or descending:
+            candidates.sort(key=key, reverse=descending)
+
+        if after is not None:
+            if descending:
+                candidates = [s for s in candidates if key(s) < after]
+            else:
+                candidates = [s for s in candidates if key(s) > after]
+
+        if limit is None or len(candidates) <= limit:
+            return candidates, None
+
+        page = candidates[:limit]
+        return page, key(page[-1])
+
+    # ---- writes ----
+
+    def update(self, client_id: str, **changes) -> ClientState | None:
+        """
+        Apply field changes. Returns the state if anything actually changed, else None.
+        Unknown clients are created on first update.
+        """
+        state = self._clients.get(client_id)
+        if state is None:
+            state = self._clients[client_id] = ClientState(client_id=client_id)
+            bisect.insort(self._sorted_ids, client_id)
+            self._by_status.setdefault(None, set()).add(client_id)
+            self._by_alive.setdefault(None, set()).add(client_id)
+
+        changed = [k for k, v in changes.items() if getattr(state, k) != v]
+        if not changed:
+            return None
+
+        if "status" in changed:
+            self._reindex(self._by_status, client_id, state.status, changes["status"])
+        if "alive_status" in changed:
+            self._reindex(self._by_alive, client_id, state.alive_status, changes["alive_status"])
+
+        for k in changed:
+            setattr(state, k, changes[k])
+        state.version += 1
+        self._dirty.add(client_id)
+
+        event = "alive" if changed == ["alive_status"] else "client"
+        hub.publish(event, state.to_dict())
+        return state
+
+    @staticmethod
+    def _reindex(index: dict, client_id: str, old, new) -> None:
+        index.get(old, set()).discard(client_id)
+        index.setdefault(new, set()).add(client_id)
+
+    def set_description(self, client_id: str, description: str | None) -> None:
+        if client_id in self._clients:
+            self.update(client_id, description=description)
+
+    def connect(self, client_id: str, ip: str, port: int, description: str | None) -> ClientState:
+        now = datetime.now(UTC)
+        self.update(
+            client_id,
+            description=description,
+            ip=ip,
+            port=port,
+            status="connected",
+            connected_at=now,
+            last_seen=now,
+        )
+        state = self._clients[client_id]
+        state.connects += 1
+        return state
+
+    def disconnect(self, client_id: str) -> ClientState | None:
+        return self.update(
+            client_id,
+            status="disconnected",
+            alive_status=None,
+            last_seen=datetime.now(UTC),
+        )
+
+    def touch(self, client_id: str) -> None:
+        """
+        Record inbound traffic. Hot path: memory only, no version bump, no event.
+        last_seen is persisted and broadcast in bulk by flush_activity().
+        """
+        state = self._clients.get(client_id)
+        if state is None:
+            return
+        now = datetime.now(UTC)
+        state.last_seen = now
+        self._activity[client_id] = now
+
+    def count_message(self, client_id: str, direction: str) -> None:
+        state = self._clients.get(client_id)
+        if state is None:
+            return
+        if direction == "incoming":
+            state.messages_in += 1
+        else:
+            state.messages_out += 1
+
+    # ---- write-behind ----
+
+    async def flush(self) -> int:
+        """Persist every dirty row with a single statement."""
+        if not self._dirty:
+            return 0
+
+        dirty, self._dirty = self._dirty, set()
+        states = [self._clients[cid] for cid in dirty if cid in self._clients]
+
+        try:
+            pool = get_pool()
+            async with pool.acquire() as conn:
+                await queries.execute(
+                    conn,
+                    "upsert_clients",
+                    [s.client_id for s in states],
+                    [s.ip for s in states],
+                    [s.port for s in states],
+                    [s.status for s in states],
+                    [s.alive_status for s in states],
+                    [s.connected_at for s in states],
+                    [s.last_seen for s in states],
+                    [s.version for s in states],
+                    settings.INSTANCE_ID,
+                )
+        except Exception:
+            # keep them dirty for the next round
+            self._dirty |= dirty
+            raise
+
+        self.flushes += 1
+        self.rows_flushed += len(states)
+        return len(states)
+
+    async def flush_activity(self) -> int:
+        """Write last_seen for every client active since the last call, in one statement."""
+        if not self._activity:
+            return 0
+
+        activity, self._activity = self._activity, {}
+        try:
+            pool = get_pool()
+            async with pool.acquire() as conn:
+                await queries.execute(
+                    conn,
+                    "touch_clients",
+                    list(activity.keys()),
+                    list(activity.values()),
+                )
+        except Exception:
+            # newer touches win; put back only what was not overwritten meanwhile
+            for cid, ts in activity.items():
+                self._activity.setdefault(cid, ts)
+            raise
+
+        # one event per flush instead of one per frame
+        changes = []
+        for cid in activity:
+            state = self._clients.get(cid)
+            if state is not None:
+                state.version += 1
+                changes.append({"client_id": cid, "last_seen": state.last_seen, "version": state.version})
+        hub.publish("activity", {"clients": changes})
+        return len(activity)
+
+    async def run_flusher(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+                await self.flush()
+                if loop.time() - self._activity_flushed_at >= ACTIVITY_FLUSH_SECONDS:
+                    self._activity_flushed_at = loop.time()
+                    await self.flush_activity()
+            except asyncio.CancelledError:
+                await self.flush()
+                await self.flush_activity()
+                raise
+            except Exception as e:
+                print(f"[REGISTRY] flush error: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self._clients),
+            "online": sum(1 for s in self._clients.values() if s.status == "connected"),
+            "dirty": len(self._dirty),
+            "active_pending": len(self._activity),
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+        }
+
+
+# Global registry shared by tcp_server, poller and routes
+registry = ClientRegistry()
@@ -2,10 +2,22 @@ from .clients import router as clients_router
 from .logs import router as logs_router
 from .allowed_clients import router as allowed_clients_router
 from .ignored_patterns import router as ignored_patterns_router
+from .events import router as events_router
+from .dashboard import router as dashboard_router
+from .metrics import router as metrics_router
+from .outbound import router as outbound_router
+from .panel_events import router as panel_events_router
+from .audit import router as audit_router
 
 __all__ = [
     "clients_router",
     "logs_router",
     "allowed_clients_router",
     "ignored_patterns_router",
+    "events_router",
+    "dashboard_router",
+    "metrics_router",
+    "outbound_router",
+    "panel_events_router",
+    "audit_router",
 ]
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends
 
 from ..db import get_pool
-from ..schemas import AllowedClientModel
+from ..schemas import AllowedClientModel, ClientDecoderModel
+from ..decoders import get_decoder
 from ..auth_session import get_current_user
+from ..registry import registry
 
 router = APIRouter(prefix="/allowed-clients", tags=["allowed-clients"])
 
@@ -13,7 +15,7 @@ async def list_allowed_clients():
     async with pool.acquire() as conn:
         rows = await conn.fetch(
             """
-            SELECT client_id, description, created_at
+            SELECT client_id, description, decoder, created_at
             FROM allowed_clients
             ORDER BY client_id;
             """
@@ -22,6 +24,7 @@ async def list_allowed_clients():
         {
             "client_id": r["client_id"],
             "description": r["description"],
+            "decoder": r["decoder"],
             "created_at": r["created_at"],
         }
         for r in rows
@@ -30,6 +33,9 @@ async def list_allowed_clients():
 
 @router.post("",dependencies=[Depends(get_current_user)])
 async def add_allowed_client(data: AllowedClientModel):
+    if data.decoder is not None and get_decoder(data.decoder) is None:
+        raise HTTPException(400, f"Unknown decoder: {data.decoder}")
+
     pool = get_pool()
     async with pool.acquire() as conn:
         existing = await conn.fetchrow(
@@ -41,13 +47,15 @@ async def add_allowed_client(data: AllowedClientModel):
 
         await conn.execute(
             """
-            INSERT INTO allowed_clients (client_id, description)
-            VALUES ($1, $2);
+            INSERT INTO allowed_clients (client_id, description, decoder)
+            VALUES ($1, $2, $3);
             """,
             data.client_id,
             data.description,
+            data.decoder,
         )
 
+    registry.set_description(data.client_id, data.description)
     return {"status": "added", "client_id": data.client_id}
 
 
@@ -63,4 +71,23 @@ async def remove_allowed_client(client_id: str):
         if deleted == 0:
             raise HTTPException(404, "client_id not found")
 
+    registry.set_description(client_id, None)
     return {"status": "removed", "client_id": client_id}
+
+
+@router.put("/{client_id}/decoder", dependencies=[Depends(get_current_user)])
+async def set_client_decoder(client_id: str, data: ClientDecoderModel):
+    """Pick the brand decoder for a client (null = store frames only). Applies live via NOTIFY."""
+    if data.decoder is not None and get_decoder(data.decoder) is None:
+        raise HTTPException(400, f"Unknown decoder: {data.decoder}")
+
+    pool = get_pool()
+    async with pool.acquire() as conn:
+        result = await conn.execute(
+            "UPDATE allowed_clients SET decoder = $2 WHERE client_id = $1",
+            client_id,
+            data.decoder,
+        )
+    if int(result.split()[-1]) == 0:
+        raise HTTPException(404, "client_id not found")
+    return {"status": "updated", "client_id": client_id, "decoder": data.decoder}
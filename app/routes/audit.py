@@ -0,0 +1,128 @@
+# app/routes/audit.py
+
+from datetime import date, datetime
+
+from fastapi import APIRouter, HTTPException, Query, Response
+
+from ..cursors import decode_cursor, encode_cursor
+from ..db import get_pool
+from .. import queries
+
+router = APIRouter(prefix="/audit", tags=["audit"])
+
+
+@router.get("")
+async def list_audit(
+    response: Response,
+    username: str | None = None,
+    user_id: int | None = None,
+    action: str | None = None,
+    client_id: str | None = None,
+    success: bool | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """
+    Audit trail, newest first. Pages are keyed on (ts, id): pass the X-Next-Cursor
+    header of one page as `cursor` to get the next. username/client_id/action filters
+    are served by the composite audit_log indexes.
+    """
+    # same approach as /panel-events: only the filters given go into the SQL
+    clauses, args = [], []
+    for column, value in (
+        ("username", username),
+        ("user_id", user_id),
+        ("action", action),
+        ("client_id", client_id),
+        ("success", success),
+    ):
+        if value is not None:
+            args.append(value)
+            clauses.append(f"{column} = ${len(args)}")
+    if since is not None:
+        args.append(since)
+        clauses.append(f"ts >= ${len(args)}")
+    if until is not None:
+        args.append(until)
+        clauses.append(f"ts < ${len(args)}")
+    if cursor is not None:
+        try:
+            ts, last_id = decode_cursor(cursor)
+            args += [datetime.fromisoformat(ts), int(last_id)]
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        clauses.append(f"(ts, id) < (${len(args) - 1}, ${len(args)})")
+    args.append(limit + 1)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    pool = get_pool()
+    async with pool.acquire() as conn:
+        rows = await queries.fetch_sql(
+            conn,
+            "audit_log",
+            f"""
+            SELECT id, ts, user_id, username, role, action, client_id, client_description,
+                   message, success, reason, remote_ip, user_agent
+            FROM audit_log
+            {where}
+            ORDER BY ts DESC, id DESC
+            LIMIT ${len(args)};
+            """,
+            *args,
+        )
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor((last["ts"].isoformat(), last["id"]))
+    return [dict(r) for r in rows]
+
+
+@router.get("/daily")
+async def audit_daily_counts(
+    action: str | None = None,
+    since: date | None = None,
+    until: date | None = None,
+):
+    """
+    Per-day, per-action counts (UTC days, split by success), read from the
+    trigger-maintained audit_daily_counts table instead of scanning audit_log.
+    """
+    clauses, args = [], []
+    if action is not None:
+        args.append(action)
+        clauses.append(f"action = ${len(args)}")
+    if since is not None:
+        args.append(since)
+        clauses.append(f"day >= ${len(args)}")
+    if until is not None:
+        args.append(until)
+        clauses.append(f"day <= ${len(args)}")
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    pool = get_pool()
+    async with pool.acquire() as conn:
+        rows = await queries.fetch_sql(
+            conn,
+            "audit_daily",
+            f"""
+            SELECT day, action,
+                   SUM(count) FILTER (WHERE success)     AS succeeded,
+                   SUM(count) FILTER (WHERE NOT success) AS failed
+            FROM audit_daily_counts
+            {where}
+            GROUP BY day, action
+            ORDER BY day DESC, action;
+            """,
+            *args,
+        )
+    return [
+        {
+            "day": r["day"],
+            "action": r["action"],
+            "succeeded": r["succeeded"] or 0,
+            "failed": r["failed"] or 0,
+        }
+        for r in rows
+    ]
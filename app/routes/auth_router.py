@@ -2,11 +2,12 @@ from datetime import datetime, timedelta, UTC
 from fastapi import APIRouter, Depends, HTTPException, Response, Request
 from pydantic import BaseModel
 
+from ..config import settings
 from ..db import get_pool
 from ..audit import write_audit
 from ..auth_session import (
-    SESSION_COOKIE, create_session,
-    verify_password, get_current_user, delete_session
+    create_session, set_session_cookie,
+    verify_password_async, get_current_user, delete_session, login_guard
 )
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -17,6 +18,9 @@ class LoginModel(BaseModel):
 
 @router.post("/login")
 async def login(data: LoginModel, response: Response, request: Request):
+    ip = request.client.host if request.client else "unknown"
+    login_guard.check(ip, data.username)
+
     pool = get_pool()
     async with pool.acquire() as conn:
         row = await conn.fetchrow(
@@ -24,20 +28,18 @@ async def login(data: LoginModel, response: Response, request: Request):
             data.username
         )
 
-    if not row or not verify_password(data.password, row["password_hash"]):
+    # Argon2 off the event loop, and only a few at a time
+    async with login_guard.slot():
+        ok = row is not None and await verify_password_async(data.password, row["password_hash"])
+
+    if not ok:
+        login_guard.failed(data.username)
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     token = await create_session(row["id"])
 
     # cookie-based session
-    response.set_cookie(
-        key=SESSION_COOKIE,
-        value=token,
-        httponly=True,
-        samesite="lax",
-        secure=False,          # LAN-only HTTP; when you move to HTTPS set True
-        max_age=60 * 60 * 24
-    )
+    set_session_cookie(response, token)
 
     await write_audit(
         request=request,
@@ -49,12 +51,12 @@ async def login(data: LoginModel, response: Response, request: Request):
 
 @router.post("/logout")
 async def logout(request: Request, response: Response, user=Depends(get_current_user)):
-    token = request.cookies.get(SESSION_COOKIE)
+    token = request.cookies.get(settings.SESSION_COOKIE)
     if token:
         await delete_session(token)
 
     response.delete_cookie(
-        key=SESSION_COOKIE,
+        key=settings.SESSION_COOKIE,
         path="/",
         samesite="lax",
     )
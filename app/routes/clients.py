@@ -1,14 +1,27 @@
 # app/routes/clients.py
 
-from fastapi import APIRouter, HTTPException, Request
+import asyncio
+import fnmatch
+import json
+from typing import Literal
 
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from ..cursors import decode_cursor, encode_cursor
 from ..db import get_pool
+from .. import queries
 from ..schemas import MessageModel
-from ..tcp_server import send_to_client
+from ..config import settings
+from ..tcp_server import send_to_client, get_online_clients, record_outgoing_many, clients, deliver_queued
+from ..registry import registry
+from ..alive import scheduler
 from fastapi import APIRouter, Depends
 from ..auth_session import require_role, get_current_user
-from ..audit import write_audit
-from ..protocol.encoder import build_payload
+from ..audit import write_audit, write_audit_many, flush_audit
+from ..commands import catalog
+from ..correlation import correlator
+from ..outbound import outbound
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/clients", tags=["clients"])
@@ -16,57 +29,89 @@ router = APIRouter(prefix="/clients", tags=["clients"])
 class SendCommandModel(BaseModel):
     client_id: str
     command_id: int
+    params: dict[str, int] | None = None
+    # block until the correlated reply arrives (or the command's reply timeout)
+    wait: bool = False
+    # offline client: store in the outbound queue instead of failing
+    queue_if_offline: bool = False
+    ttl_seconds: int | None = None      # default OUTBOUND_DEFAULT_TTL_SECONDS
+    # a pending item with the same key for this client is replaced, not queued twice;
+    # default: command name + rendered payload, so only identical sends collapse
+    dedup_key: str | None = None
+
+
+class BroadcastModel(BaseModel):
+    command_id: int
+    params: dict[str, int] | None = None
+    # target selector; all given criteria must match
+    client_ids: list[str] | None = None
+    description: str | None = None      # case-insensitive glob, e.g. "warehouse*"
+    online_only: bool = True
 
 
 @router.get("")
-async def list_all_clients(depend=Depends(get_current_user)):
+async def list_all_clients(
+    response: Response,
+    status: str | None = None,
+    alive_status: str | None = None,
+    q: str | None = None,
+    sort: Literal["client_id", "description", "status", "last_seen"] = "client_id",
+    order: Literal["asc", "desc"] = "asc",
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    cursor: str | None = None,
+    depend=Depends(get_current_user),
+):
     """
-    Return all known clients (connected or not) with their description
-    (joined from allowed_clients if present).
+    Return known clients (connected or not) with their description,
+    straight from the in-memory registry.
+    Optional filters: status, alive_status, q (client_id/description search).
+    With `limit`, the next page cursor is returned in the X-Next-Cursor header.
     """
-    pool = get_pool()
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(
-            """
-            SELECT
-                c.client_id,
-                c.ip,
-                c.port,
-                c.status,
-                c.connected_at,
-                c.last_seen,
-                c.alive_status,
-                a.description
-            FROM clients c
-            LEFT JOIN allowed_clients a
-                ON c.client_id = a.client_id
-            ORDER BY c.client_id;
-            """
+    try:
+        page, next_key = registry.query(
+            status=status,
+            alive_status=alive_status,
+            search=q,
+            sort=sort,
+            descending=order == "desc",
+            after=decode_cursor(cursor) if cursor else None,
+            limit=limit,
         )
-    return [
-        {
-            "client_id": r["client_id"],
-            "description": r["description"],
-            "ip": str(r["ip"]) if r["ip"] is not None else None,
-            "port": r["port"],
-            "status": r["status"],
-            "connected_at": r["connected_at"],
-            "last_seen": r["last_seen"],
-            "alive_status": r["alive_status"],
-        }
-        for r in rows
-    ]
+    except TypeError:
+        # cursor produced under a different sort key
+        raise HTTPException(status_code=400, detail="Cursor does not match sort")
+    if next_key is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor(next_key)
+    return [{**s.to_dict(), **_rtt_fields(s.client_id)} for s in page]
+
+
+def _rtt_fields(client_id: str) -> dict:
+    rtt = scheduler.rtt_summary(client_id)
+    return {
+        "rtt_p50_ms": rtt["p50_ms"],
+        "rtt_p95_ms": rtt["p95_ms"],
+        "rtt_p99_ms": rtt["p99_ms"],
+    }
+
+
+@router.get("/counts")
+async def client_counts(depend=Depends(get_current_user)):
+    """Online / offline / pending totals for overview screens."""
+    return registry.counts()
+
+
+@router.get("/{client_id}/latency")
+async def client_latency(client_id: str, depend=Depends(get_current_user)):
+    """Alive-probe round-trip percentiles since the server started."""
+    if registry.get(client_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown client")
+    return {"client_id": client_id, **scheduler.rtt_summary(client_id)}
 
 
 @router.get("/online")
-async def online_clients():
-    """
-    Kept as-is (based on in-memory connections).
-    Frontend will stop using this and derive online from /clients.
-    """
-    # If you still have get_online_clients in tcp_server, you can keep this using it,
-    # but the frontend won't depend on this endpoint anymore.
-    return []
+async def online_clients(depend=Depends(get_current_user)):
+    """Currently connected clients, from the in-memory registry."""
+    return sorted(get_online_clients(), key=lambda c: c["client_id"])
 
 
 @router.post("/send", dependencies=[Depends(require_role("admin","operator"))])
@@ -78,8 +123,9 @@ async def send_message_api(
     # get description snapshot (optional but nice)
     pool = get_pool()
     async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT description FROM allowed_clients WHERE client_id = $1;",
+        row = await queries.fetchrow(
+            conn,
+            "client_description",
             data.client_id
         )
     desc = row["description"] if row else None
@@ -117,7 +163,12 @@ async def send_message_api(
             message=data.message,
             success=True,
         )
-        return {"status": "sent"}
+        result = {"status": "sent"}
+        if action == "RESET":
+            # panel resets must be on record before we report success; the reset already
+            # went out, so a missed audit row is reported instead of failing the call
+            result["audit_written"] = await flush_audit()
+        return result
     except Exception as e:
         await write_audit(
             request=request,
@@ -137,56 +188,32 @@ async def send_command_api(
     request: Request,
     user=Depends(require_role("admin", "operator")),
 ):
-    pool = get_pool()
-
-    # 1) Load command
-    async with pool.acquire() as conn:
-        cmd = await conn.fetchrow(
-            """
-            SELECT *
-            FROM tcp_commands
-            WHERE id = $1 AND enabled = TRUE
-            """,
-            data.command_id,
-        )
-
+    # 1) Load command (in-memory catalog)
+    cmd = catalog.get(data.command_id)
     if not cmd:
         raise HTTPException(status_code=404, detail="Command not found or disabled")
 
     # 2) Permission check
-    if cmd["admin_only"] and user["role"] != "admin":
+    if cmd.admin_only and user["role"] != "admin":
         await write_audit(
             request=request,
             action="DENIED_COMMAND",
             user=user,
             client_id=data.client_id,
-            message=cmd["name"],
+            message=cmd.name,
             success=False,
             reason="admin_only",
         )
         raise HTTPException(status_code=403, detail="Admin-only command")
-    
-    # 2.5) Client ↔ command compatibility check
-    async with pool.acquire() as conn:
-        compatible = await conn.fetchval(
-            """
-            SELECT 1
-            FROM client_commands
-            WHERE client_id = $1
-            AND command_id = $2
-            AND enabled = TRUE
-            """,
-            data.client_id,
-            data.command_id,
-        )
 
-    if not compatible:
+    # 2.5) Client ↔ command compatibility check
+    if not catalog.is_compatible(data.client_id, data.command_id):
         await write_audit(
             request=request,
             action="DENIED_COMMAND",
             user=user,
             client_id=data.client_id,
-            message=cmd["name"],
+            message=cmd.name,
             success=False,
             reason="command_not_supported_by_client",
         )
@@ -194,22 +221,59 @@ async def send_command_api(
             status_code=403,
             detail="Command not supported by this client")
 
-    # 3) Build payload bytes
+    # 3) Fill the precompiled template (static commands are already rendered)
     try:
-        payload_bytes = build_payload(dict(cmd))
-    except Exception as e:
+        payload_bytes = cmd.render(data.params)
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Payload error: {e}")
 
-    # 4) Send over TCP
+    if data.wait and cmd.reply_matcher is None:
+        raise HTTPException(status_code=400, detail="Command has no reply pattern to wait for")
+
+    # 3.5) Offline: queue for delivery on the next registration
+    if data.queue_if_offline and data.client_id not in clients:
+        queue_id, inserted = await outbound.enqueue(
+            data.client_id,
+            command_id=cmd.id,
+            command_name=cmd.name,
+            payload=payload_bytes,
+            ttl_seconds=data.ttl_seconds or settings.OUTBOUND_DEFAULT_TTL_SECONDS,
+            dedup_key=data.dedup_key or f"{cmd.name}:{payload_bytes.hex()}",
+            created_by=user["username"],
+        )
+        await write_audit(
+            request=request,
+            action="COMMAND_QUEUED",
+            user=user,
+            client_id=data.client_id,
+            message=cmd.name,
+            success=True,
+            reason=None if inserted else "deduplicated",
+        )
+        # it may have registered while we were inserting
+        if data.client_id in clients:
+            deliver_queued(data.client_id)
+        return {
+            "status": "queued",
+            "command": cmd.name,
+            "client_id": data.client_id,
+            "queue_id": queue_id,
+            "deduplicated": not inserted,
+        }
+
+    # 4) Send over TCP (expectation registered first so a fast reply is not missed)
+    pending = correlator.expect(data.client_id, cmd) if cmd.reply_matcher else None
     try:
         await send_to_client(data.client_id, payload_bytes)
     except Exception as e:
+        if pending is not None:
+            correlator.cancel(pending)
         await write_audit(
             request=request,
             action="COMMAND_SEND_FAILED",
             user=user,
             client_id=data.client_id,
-            message=cmd["name"],
+            message=cmd.name,
             success=False,
             reason=str(e),
         )
@@ -221,35 +285,193 @@ async def send_command_api(
         action="COMMAND_SENT",
         user=user,
         client_id=data.client_id,
-        message=cmd["name"],
+        message=cmd.name,
         success=True,
     )
+    audit = {}
+    if cmd.admin_only:
+        # privileged commands must be on record before we report success; the command
+        # already went out, so a missed audit row is reported instead of failing the call
+        audit["audit_written"] = await flush_audit()
+
+    if not data.wait:
+        return {
+            "status": "sent",
+            "command": cmd.name,
+            "client_id": data.client_id,
+            **audit,
+        }
 
+    # 6) Wait for the correlated reply
+    result = await correlator.wait(pending)
+    if result is None:
+        return {
+            "status": "timeout",
+            "command": cmd.name,
+            "client_id": data.client_id,
+            "reply": None,
+            "latency_ms": None,
+            **audit,
+        }
+    reply, rtt = result
     return {
-        "status": "sent",
-        "command": cmd["name"],
+        "status": "replied",
+        "command": cmd.name,
         "client_id": data.client_id,
+        "reply": reply,
+        "latency_ms": round(rtt * 1000, 3),
+        **audit,
     }
 
+# keep strong refs to running fan-outs (the event loop only holds weak ones)
+_broadcasts: set[asyncio.Task] = set()
+
+
+def _broadcast_targets(data: BroadcastModel) -> list[str]:
+    if data.client_ids is not None:
+        states = [registry.get(cid) for cid in dict.fromkeys(data.client_ids)]
+        states = [st for st in states if st is not None]
+    else:
+        states = registry.all()
+    if data.online_only:
+        states = [st for st in states if st.status == "connected"]
+    if data.description:
+        pattern = data.description.lower()
+        states = [st for st in states if fnmatch.fnmatchcase((st.description or "").lower(), pattern)]
+    return [st.client_id for st in states]
+
+
+async def _run_broadcast(
+    request: Request,
+    user: dict,
+    cmd,
+    payload: bytes,
+    targets: list[str],
+    results: asyncio.Queue,
+) -> None:
+    """
+    Fan the payload out with bounded parallelism, pushing one result per target into
+    `results` (None at the end). Runs detached from the HTTP stream so a client that
+    stops reading does not leave sends or audit rows half-done.
+    """
+    audit_rows = []
+    sent = []
+    sem = asyncio.Semaphore(settings.BROADCAST_CONCURRENCY)
+
+    async def send_one(client_id: str) -> dict:
+        async with sem:
+            # replies are correlated for RTT stats; the stream does not wait for them
+            pending = correlator.expect(client_id, cmd) if cmd.reply_matcher else None
+            try:
+                ts = await send_to_client(client_id, payload, record=False)
+            except Exception as e:
+                if pending is not None:
+                    correlator.cancel(pending)
+                return {"client_id": client_id, "ok": False, "error": str(e)}
+            sent.append((client_id, ts))
+            return {"client_id": client_id, "ok": True}
+
+    try:
+        compatible = []
+        for client_id in targets:
+            if catalog.is_compatible(client_id, cmd.id):
+                compatible.append(client_id)
+                continue
+            audit_rows.append({"action": "DENIED_COMMAND", "client_id": client_id,
+                               "message": cmd.name, "success": False,
+                               "reason": "command_not_supported_by_client"})
+            await results.put({"client_id": client_id, "ok": False, "skipped": True,
+                               "error": "command_not_supported_by_client"})
+
+        for fut in asyncio.as_completed([send_one(cid) for cid in compatible]):
+            res = await fut
+            if res["ok"]:
+                audit_rows.append({"action": "COMMAND_SENT", "client_id": res["client_id"],
+                                   "message": cmd.name, "success": True})
+            else:
+                audit_rows.append({"action": "COMMAND_SEND_FAILED", "client_id": res["client_id"],
+                                   "message": cmd.name, "success": False, "reason": res["error"]})
+            await results.put(res)
+    finally:
+        for row in audit_rows:
+            st = registry.get(row["client_id"])
+            row["client_description"] = st.description if st else None
+        try:
+            await record_outgoing_many(sent, payload)
+            await write_audit_many(request=request, user=user, rows=audit_rows)
+        except Exception as e:
+            print(f"[BROADCAST] bulk insert error: {e}")
+        await results.put(None)
+
+
+@router.post("/broadcast")
+async def broadcast_command_api(
+    data: BroadcastModel,
+    request: Request,
+    user=Depends(require_role("admin", "operator")),
+):
+    """
+    Send one command to many clients. Streams NDJSON: one line per target as its send
+    completes, then a summary line {"done": true, ...}.
+    """
+    cmd = catalog.get(data.command_id)
+    if not cmd:
+        raise HTTPException(status_code=404, detail="Command not found or disabled")
+
+    if cmd.admin_only and user["role"] != "admin":
+        await write_audit(
+            request=request,
+            action="DENIED_COMMAND",
+            user=user,
+            message=cmd.name,
+            success=False,
+            reason="admin_only",
+        )
+        raise HTTPException(status_code=403, detail="Admin-only command")
+
+    # encoded once for every target
+    try:
+        payload_bytes = cmd.render(data.params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Payload error: {e}")
+
+    targets = _broadcast_targets(data)
+    results: asyncio.Queue = asyncio.Queue()
+    task = asyncio.create_task(_run_broadcast(request, user, cmd, payload_bytes, targets, results))
+    _broadcasts.add(task)
+    task.add_done_callback(_broadcasts.discard)
+
+    async def stream():
+        counts = {"sent": 0, "failed": 0, "skipped": 0}
+        while True:
+            res = await results.get()
+            if res is None:
+                break
+            if res.get("skipped"):
+                counts["skipped"] += 1
+            elif res["ok"]:
+                counts["sent"] += 1
+            else:
+                counts["failed"] += 1
+            yield json.dumps(res) + "\n"
+        yield json.dumps({"done": True, "command": cmd.name, "targets": len(targets), **counts}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @router.get("/{client_id}/commands")
 async def get_client_commands(
     client_id: str,
     user=Depends(require_role("admin", "operator")),
 ):
-    pool = get_pool()
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(
-            """
-            SELECT c.id, c.name, c.description, c.admin_only
-            FROM tcp_commands c
-            JOIN client_commands cc ON cc.command_id = c.id
-            WHERE cc.client_id = $1
-              AND cc.enabled = TRUE
-              AND c.enabled = TRUE
-              AND c.ui_visible = TRUE
-            ORDER BY c.name
-            """,
-            client_id,
-        )
-    return [dict(r) for r in rows]
-
+    return [
+        {
+            "id": c.id,
+            "name": c.name,
+            "description": c.description,
+            "admin_only": c.admin_only,
+            "params": c.params(),
+            "expects_reply": c.reply_matcher is not None,
+        }
+        for c in catalog.for_client(client_id)
+    ]
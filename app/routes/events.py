@@ -0,0 +1,46 @@
+# app/routes/events.py
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+
+from ..auth_session import get_current_user
+from ..events import hub
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+KEEPALIVE_SECONDS = 15
+
+
+@router.get("", dependencies=[Depends(get_current_user)])
+async def event_stream(request: Request):
+    """
+    Server-Sent Events push stream for dashboards.
+    Event types: client, alive, activity, message, panel_event, command, outbound, resync.
+    """
+    last_id = request.headers.get("last-event-id")
+    try:
+        last_event_id = int(last_id) if last_id else None
+    except ValueError:
+        last_event_id = None
+
+    sub = hub.subscribe(last_event_id)
+
+    async def stream():
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                if await request.is_disconnected():
+                    break
+                frames = await sub.next_batch(KEEPALIVE_SECONDS)
+                if not frames:
+                    yield b": keepalive\n\n"
+                    continue
+                yield b"".join(frames)
+        finally:
+            hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
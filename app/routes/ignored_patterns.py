@@ -1,7 +1,7 @@
 # app/routes/ignored_patterns.py
 
 from fastapi import APIRouter, HTTPException, Depends
-from ..db import get_pool
+from ..db import get_pool, invalidate_ignore_patterns
 from ..schemas import IgnorePatternModel
 from ..auth_session import get_current_user
 router = APIRouter(prefix="/ignored-patterns", tags=["ignored-patterns"])
@@ -44,6 +44,7 @@ async def add_ignored_pattern(data: IgnorePatternModel):
             data.pattern,
             data.description,
         )
+    invalidate_ignore_patterns()
     return {"status": "added", "id": row["id"]}
 
 
@@ -62,4 +63,5 @@ async def deactivate_ignored_pattern(pattern_id: int):
         updated = int(result.split()[-1])
         if updated == 0:
             raise HTTPException(404, "pattern_id not found")
+    invalidate_ignore_patterns()
     return {"status": "deactivated", "id": pattern_id}
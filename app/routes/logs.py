@@ -1,54 +1,52 @@
 from fastapi import APIRouter, Depends
 
-from ..db import get_pool, should_ignore_message
+from ..db import get_pool, is_dashboard_visible, should_ignore_message, DASHBOARD_HIDDEN_MESSAGES
+from .. import queries
 from ..auth_session import get_current_user
+from ..protocol.views import View, decode_text, render
 
 router = APIRouter(prefix="/logs", tags=["logs"])
 
 
 @router.get("", dependencies=[Depends(get_current_user)])
-async def get_logs(limit: int = 10):
+async def get_logs(limit: int = 10, after_id: int = 0, view: View = "text"):
     """
     Return up to `limit` messages that are NOT matched by ignored_patterns.
     All messages are still stored in DB; filtering is only for the dashboard.
+    `after_id` returns only messages newer than the last one the caller has.
+    `view` picks how the stored frame is shown: text, hex or base64 (decoded per returned row).
     """
     pool = get_pool()
     async with pool.acquire() as conn:
         # Fetch more than we need, because some will be ignored
         inner_limit = max(limit * 5, 100)
-        rows = await conn.fetch(
-            """
-            SELECT
-                m.client_id,
-                a.description,
-                m.direction,
-                m.message,
-                m.timestamp,
-                m.remote_ip,
-                m.remote_port
-            FROM messages m
-            LEFT JOIN allowed_clients a
-                ON m.client_id = a.client_id
-            WHERE m.direction = 'incoming' AND m.message NOT IN ('#NFS640.027.001', 'SERIAL NUMBER = 0010365116','- ')
-            ORDER BY m.timestamp DESC
-            LIMIT $1;
-            """,
+        rows = await queries.fetch(
+            conn,
+            "dashboard_logs",
             inner_limit,
+            list(DASHBOARD_HIDDEN_MESSAGES),
+            after_id,
         )
 
     result = []
     for r in rows:
-        msg = r["message"] or ""
+        msg = r["message"]
+        if msg is None:
+            # text column not stored: decode now; the SQL banner filter could not see it
+            msg = decode_text(r["raw"]) if r["raw"] is not None else ""
+            if not await is_dashboard_visible(msg):
+                continue
         # 🔥 Filter only for dashboard
-        if await should_ignore_message(msg):
+        elif await should_ignore_message(msg):
             continue
 
         result.append(
             {
+                "id": r["id"],
                 "client_id": r["client_id"],
                 "description": r["description"],
                 "direction": r["direction"],
-                "message": r["message"],
+                "message": msg if view == "text" else render(r["raw"], msg, view),
                 "timestamp": r["timestamp"],
                 "remote_ip": r["remote_ip"],
                 "remote_port": r["remote_port"],
@@ -0,0 +1,44 @@
+# app/routes/metrics.py
+
+from fastapi import APIRouter, Query
+
+from ..alive import scheduler
+from ..commands import catalog
+from ..correlation import correlator
+from ..outbound import outbound
+from ..decoders import assignments
+from ..db import get_pool
+from ..queries import QuerySort, query_stats
+from ..auth_session import session_cache, login_guard, housekeeping
+from ..audit import audit_sink
+from ..events import hub
+from ..registry import registry
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("")
+async def get_metrics():
+    """In-process counters for the event hub, client registry and alive scheduler."""
+    return {
+        "events": hub.stats(),
+        "registry": registry.stats(),
+        "alive": scheduler.stats(),
+        "commands": catalog.stats(),
+        "replies": correlator.stats(),
+        "outbound": outbound.stats(),
+        "decoders": assignments.stats(),
+        "sessions": {**housekeeping.stats(), "cache": session_cache.stats()},
+        "login": login_guard.stats(),
+        "audit": audit_sink.stats(),
+        "db": get_pool().stats(),
+    }
+
+
+@router.get("/queries")
+async def get_query_metrics(
+    sort: QuerySort = "total",
+    limit: int = Query(20, ge=1, le=200),
+):
+    """Named queries by total (or mean/p99/max) execution time since start."""
+    return query_stats.top(limit, sort)
@@ -0,0 +1,92 @@
+# app/routes/outbound.py
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from ..audit import write_audit
+from ..auth_session import get_current_user, require_role
+from ..db import get_pool
+from ..outbound import outbound
+
+router = APIRouter(prefix="/outbound", tags=["outbound"])
+
+Status = Literal["pending", "delivered", "expired", "cancelled"]
+
+
+def _row(r) -> dict:
+    return {
+        "id": r["id"],
+        "client_id": r["client_id"],
+        "command_id": r["command_id"],
+        "command_name": r["command_name"],
+        "dedup_key": r["dedup_key"],
+        "status": r["status"],
+        "attempts": r["attempts"],
+        "last_error": r["last_error"],
+        "created_by": r["created_by"],
+        "created_at": r["created_at"],
+        "expires_at": r["expires_at"],
+        "delivered_at": r["delivered_at"],
+    }
+
+
+@router.get("", dependencies=[Depends(get_current_user)])
+async def list_outbound(
+    client_id: str | None = None,
+    status: Status | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    pool = get_pool()
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT id, client_id, command_id, command_name, dedup_key, status, attempts,
+                   last_error, created_by, created_at, expires_at, delivered_at
+            FROM outbound_queue
+            WHERE ($1::text IS NULL OR client_id = $1)
+              AND ($2::text IS NULL OR status = $2)
+            ORDER BY id DESC
+            LIMIT $3;
+            """,
+            client_id,
+            status,
+            limit,
+        )
+    return [_row(r) for r in rows]
+
+
+@router.get("/{item_id}", dependencies=[Depends(get_current_user)])
+async def get_outbound(item_id: int):
+    pool = get_pool()
+    async with pool.acquire() as conn:
+        r = await conn.fetchrow(
+            """
+            SELECT id, client_id, command_id, command_name, dedup_key, status, attempts,
+                   last_error, created_by, created_at, expires_at, delivered_at
+            FROM outbound_queue
+            WHERE id = $1;
+            """,
+            item_id,
+        )
+    if not r:
+        raise HTTPException(status_code=404, detail="Queue item not found")
+    return _row(r)
+
+
+@router.delete("/{item_id}")
+async def cancel_outbound(
+    item_id: int,
+    request: Request,
+    user=Depends(require_role("admin", "operator")),
+):
+    if not await outbound.cancel(item_id):
+        raise HTTPException(status_code=404, detail="No pending queue item with this id")
+    await write_audit(
+        request=request,
+        action="COMMAND_QUEUE_CANCELLED",
+        user=user,
+        message=str(item_id),
+        success=True,
+    )
+    return {"status": "cancelled", "id": item_id}
@@ -0,0 +1,83 @@
+# app/routes/panel_events.py
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+from ..auth_session import get_current_user
+from ..cursors import decode_cursor, encode_cursor
+from ..db import get_pool
+from .. import queries
+from ..decoders import available
+
+router = APIRouter(prefix="/panel-events", tags=["panel-events"])
+
+
+@router.get("", dependencies=[Depends(get_current_user)])
+async def list_panel_events(
+    response: Response,
+    client_id: str | None = None,
+    event_type: str | None = None,
+    zone: int | None = None,
+    partition: int | None = None,
+    since: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """
+    Decoded panel events, newest first. event_type (+ zone) and client_id filters are
+    served by the events indexes. Pages are keyed on (ts, id): pass the X-Next-Cursor
+    header of one page as `cursor` to get the next.
+    """
+    # only the filters actually given go into the SQL, so the planner can pick the
+    # matching index instead of a generic "$n IS NULL OR ..." plan
+    clauses, args = [], []
+    for column, value in (
+        ("e.client_id", client_id),
+        ("e.event_type", event_type),
+        ("e.zone", zone),
+        ("e.partition", partition),
+    ):
+        if value is not None:
+            args.append(value)
+            clauses.append(f"{column} = ${len(args)}")
+    if since is not None:
+        args.append(since)
+        clauses.append(f"e.ts >= ${len(args)}")
+    if cursor is not None:
+        try:
+            ts, last_id = decode_cursor(cursor)
+            args += [datetime.fromisoformat(ts), int(last_id)]
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        clauses.append(f"(e.ts, e.id) < (${len(args) - 1}, ${len(args)})")
+    args.append(limit + 1)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    pool = get_pool()
+    async with pool.acquire() as conn:
+        rows = await queries.fetch_sql(
+            conn,
+            "panel_events",
+            f"""
+            SELECT e.id, e.message_id, e.client_id, a.description, e.ts, e.decoder,
+                   e.event_type, e.code, e.account, e.partition, e.zone, e.user_no, e.restore
+            FROM events e
+            LEFT JOIN allowed_clients a ON a.client_id = e.client_id
+            {where}
+            ORDER BY e.ts DESC, e.id DESC
+            LIMIT ${len(args)};
+            """,
+            *args,
+        )
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor((last["ts"].isoformat(), last["id"]))
+    return [dict(r) for r in rows]
+
+
+@router.get("/decoders", dependencies=[Depends(get_current_user)])
+async def list_decoders():
+    """Registered brand decoders, for allowed_clients.decoder."""
+    return available()
@@ -9,6 +9,11 @@ class MessageModel(BaseModel):
 class AllowedClientModel(BaseModel):
     client_id: str
     description: str | None = None
+    decoder: str | None = None
+
+
+class ClientDecoderModel(BaseModel):
+    decoder: str | None = None
 
 
 class IgnorePatternModel(BaseModel):
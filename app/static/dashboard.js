@@ -0,0 +1,474 @@
+// ---------------- AUTH / SESSION ----------------
+let currentUser = null;
+
+function showDashboard() {
+    document.getElementById("dashboardApp").style.display = "block";
+    document.getElementById("loginOverlay").style.display = "none";
+}
+
+function showLogin() {
+    document.getElementById("dashboardApp").style.display = "none";
+    document.getElementById("loginOverlay").style.display = "flex";
+    document.getElementById("userBadge").textContent = "";
+}
+
+async function loadMe() {
+    try {
+        const res = await fetch("/auth/me");
+        if (res.ok) {
+            currentUser = await res.json();
+            showDashboard();
+            applyRoleUI();
+            return true;
+        }
+    } catch {}
+    currentUser = null;
+    showLogin();
+    return false;
+}
+
+async function doLogin() {
+    const username = document.getElementById("loginUser").value.trim();
+    const password = document.getElementById("loginPass").value.trim();
+    const status = document.getElementById("loginStatus");
+
+    status.textContent = "Accediendo...";
+
+    const res = await fetch("/auth/login", {
+        method: "POST",
+        headers: {"Content-Type": "application/json"},
+        body: JSON.stringify({ username, password })
+    });
+
+    if (!res.ok) {
+        status.textContent = "Usuario y contraseña incorrectos.";
+        return;
+    }
+
+    status.textContent = "Conexion Exitosa ✅";
+
+    const ok = await loadMe();
+    if (!ok) return;
+
+    refreshClients();
+    refreshLogs();
+    startEventStream();
+}
+
+function applyRoleUI() {
+    if (!currentUser) return;
+
+    const badge = document.getElementById("userBadge");
+    if (badge) {
+        badge.textContent =
+            `Sesion iniciada como: ${currentUser.username} (${currentUser.role})`;
+    }
+}
+
+
+function formatTime(ts) {
+    if (!ts) return "";
+    const d = new Date(ts);
+    return d.toLocaleString();
+}
+
+// Keyed view state: one <tr> (and one <option> while online) per client_id.
+// A row is only repainted when the version from /clients or /events is newer
+// than the one on screen, so a tick touches just the rows that changed.
+const clientRows = new Map();
+const RECENT_LOGS_LIMIT = 10;
+const renderedLogIds = new Set();
+let lastLogId = 0;
+
+async function refreshClients() {
+    try {
+        const res = await fetch("/clients");
+        const all = await res.json();
+
+        const seen = new Set();
+        all.forEach(c => {
+            seen.add(c.client_id);
+            applyClient(c);
+        });
+
+        // drop rows that disappeared server-side
+        Array.from(clientRows.keys()).forEach(id => {
+            if (!seen.has(id)) removeClientRow(id);
+        });
+        updateSelectPlaceholder();
+    } catch (err) {
+        console.error("Error refreshing clients:", err);
+    }
+}
+
+function applyClient(c) {
+    let row = clientRows.get(c.client_id);
+
+    if (!row) {
+        row = createClientRow(c);
+    } else {
+        // same or older version than what is rendered: nothing to do
+        if (c.version != null && row.version != null && c.version <= row.version) return;
+        row.data = { ...row.data, ...c };
+    }
+
+    if (c.version != null) row.version = c.version;
+    paintClientRow(row);
+}
+
+function createClientRow(c) {
+    const tr = document.createElement("tr");
+    tr.dataset.id = c.client_id;
+
+    const tdName = document.createElement("td");
+    const tdAlive = document.createElement("td");
+    const alivePill = document.createElement("span");
+    alivePill.classList.add("status-pill");
+    tdAlive.appendChild(alivePill);
+    const tdLastSeen = document.createElement("td");
+
+    tr.appendChild(tdName);
+    tr.appendChild(tdAlive);
+    tr.appendChild(tdLastSeen);
+
+    const tbody = document.querySelector("#clientsTable tbody");
+    insertSorted(tbody, tr, c.client_id);
+
+    const row = { data: { ...c }, version: null, tr, tdName, alivePill, tdLastSeen, opt: null };
+    clientRows.set(c.client_id, row);
+    return row;
+}
+
+function paintClientRow(row) {
+    const c = row.data;
+    const label = c.description || c.client_id;
+
+    setText(row.tdName, label);
+
+    let aliveClass = null;
+    let aliveText = "";
+    if (c.alive_status === "connected") {
+        aliveClass = "status-online";
+        aliveText = "CONNECTED";
+    } else if (c.alive_status === "pending") {
+        aliveClass = "status-offline";
+        aliveText = "PENDING";
+    } else if (c.alive_status === "timeout") {
+        aliveClass = "status-offline";
+        aliveText = "TIMEOUT";
+    }
+    row.alivePill.classList.toggle("status-online", aliveClass === "status-online");
+    row.alivePill.classList.toggle("status-offline", aliveClass === "status-offline");
+    setText(row.alivePill, aliveText);
+
+    setText(row.tdLastSeen, c.last_seen ? formatTime(c.last_seen) : "");
+
+    // Selector holds online panels only; existing options are never rebuilt,
+    // so the operator's current selection stays put.
+    const select = document.getElementById("clientSelect");
+    if (c.status === "connected") {
+        if (!row.opt) {
+            row.opt = document.createElement("option");
+            row.opt.value = c.client_id;
+            insertSorted(select, row.opt, c.client_id);
+        }
+        setText(row.opt, label);
+    } else if (row.opt) {
+        row.opt.remove();
+        row.opt = null;
+    }
+    updateSelectPlaceholder();
+}
+
+function removeClientRow(client_id) {
+    const row = clientRows.get(client_id);
+    if (!row) return;
+    row.tr.remove();
+    if (row.opt) row.opt.remove();
+    clientRows.delete(client_id);
+}
+
+function updateSelectPlaceholder() {
+    const select = document.getElementById("clientSelect");
+    const placeholder = select.querySelector('option[value=""]');
+    if (!placeholder) return;
+    setText(placeholder, select.options.length > 1 ? "-- Seleccione Panel --" : "-- no online clients --");
+}
+
+// Insert `node` keeping siblings ordered by data-id / value (placeholder option stays first)
+function insertSorted(parent, node, key) {
+    for (const child of parent.children) {
+        const childKey = child.dataset.id || child.value;
+        if (childKey && childKey.localeCompare(key) > 0) {
+            parent.insertBefore(node, child);
+            return;
+        }
+    }
+    parent.appendChild(node);
+}
+
+function setText(el, text) {
+    if (el.textContent !== text) el.textContent = text;
+}
+
+async function refreshLogs() {
+    try {
+        const res = await fetch(`/logs?limit=${RECENT_LOGS_LIMIT}&after_id=${lastLogId}`);
+        const data = await res.json();
+
+        // API returns newest first; add oldest first so the newest ends on top
+        data.slice().reverse().forEach(addLogLine);
+    } catch (err) {
+        console.error("Error refreshing logs:", err);
+    }
+}
+
+function addLogLine(log) {
+    if (renderedLogIds.has(log.id)) return;
+
+    const container = document.getElementById("recentMessages");
+    if (renderedLogIds.size === 0) {
+        container.innerHTML = "";  // remove "no messages" placeholder
+    }
+
+    const line = document.createElement("div");
+    line.classList.add("msg-line");
+    line.dataset.id = log.id;
+
+    const t = document.createElement("span");
+    t.classList.add("msg-time");
+    t.textContent = `[${formatTime(log.timestamp)}] `;
+
+    const d = document.createElement("span");
+    if (log.direction === "incoming") {
+        d.classList.add("msg-dir-in");
+        d.textContent = "DESDE  ";
+    } else if (log.direction === "outgoing") {
+        d.classList.add("msg-dir-out");
+        d.textContent = "OUT ";
+    } else {
+        d.classList.add("msg-dir-sys");
+        d.textContent = "SYS ";
+    }
+
+    const c = document.createElement("span");
+    c.textContent = `[${log.description || "N/A"}] `;
+
+    const m = document.createElement("span");
+    m.textContent = log.message || "";
+
+    line.appendChild(t);
+    line.appendChild(d);
+    line.appendChild(c);
+    line.appendChild(m);
+
+    container.insertBefore(line, container.firstChild);
+    renderedLogIds.add(log.id);
+    lastLogId = Math.max(lastLogId, log.id);
+
+    // keep only the newest N lines
+    while (container.children.length > RECENT_LOGS_LIMIT) {
+        const old = container.lastChild;
+        renderedLogIds.delete(Number(old.dataset.id));
+        old.remove();
+    }
+}
+
+async function quickSend(payload) {
+    const select = document.getElementById("clientSelect");
+    const client_id = select.value;
+    const statusSpan = document.getElementById("sendStatus");
+
+    if (!client_id) {
+        statusSpan.textContent = "Select a client first.";
+        return;
+    }
+
+    try {
+        const res = await fetch("/clients/send", {
+            method: "POST",
+            headers: {"Content-Type": "application/json"},
+            body: JSON.stringify({ client_id, message: payload })
+        });
+
+        if (!res.ok) {
+            const data = await res.json().catch(() => ({}));
+            statusSpan.textContent = `Error: ${data.detail || res.status}`;
+            return;
+        }
+
+        refreshLogs();   // update dashboard history
+    } catch (err) {
+        console.error("Quick send error:", err);
+        statusSpan.textContent = "Error sending quick command.";
+    }
+}
+
+// ---------------- LIVE UPDATES (SSE) ----------------
+let eventSource = null;
+
+function startEventStream() {
+    if (eventSource) return; // already running
+
+    // Browser reconnects on its own and resends Last-Event-ID
+    eventSource = new EventSource("/events");
+
+    eventSource.addEventListener("client", (e) => applyClient(JSON.parse(e.data)));
+    eventSource.addEventListener("alive", (e) => {
+        // alive events are partial; only patch rows we already have
+        const data = JSON.parse(e.data);
+        if (clientRows.has(data.client_id)) applyClient(data);
+    });
+
+    // batched last_seen updates, one event per server flush
+    eventSource.addEventListener("activity", (e) => {
+        JSON.parse(e.data).clients.forEach(c => {
+            if (clientRows.has(c.client_id)) applyClient(c);
+        });
+    });
+
+    eventSource.addEventListener("message", (e) => {
+        const log = JSON.parse(e.data);
+        if (log.visible) addLogLine(log);
+    });
+
+    // Server could not replay what we missed: reload full state
+    eventSource.addEventListener("resync", () => {
+        // versions may restart after a server restart; accept whatever comes back
+        clientRows.forEach(row => { row.version = null; });
+        refreshClients();
+        refreshLogs();
+    });
+
+    eventSource.onerror = () => {
+        if (eventSource && eventSource.readyState === EventSource.CLOSED) {
+            // stream refused (e.g. session expired)
+            stopEventStream();
+            loadMe();
+        }
+    };
+}
+
+function stopEventStream() {
+    if (eventSource) {
+        eventSource.close();
+        eventSource = null;
+    }
+}
+
+async function doLogout() {
+    try {
+        await fetch("/auth/logout", { method: "POST" });
+    } catch {}
+
+    currentUser = null;
+
+    // reset UI
+    document.getElementById("dashboardApp").style.display = "none";
+    document.getElementById("loginOverlay").style.display = "flex";
+
+    // clear fields
+    document.getElementById("loginPass").value = "";
+    document.getElementById("loginStatus").textContent = "";
+
+    stopEventStream();
+
+}
+
+window.addEventListener("load", async () => {
+    document.getElementById("loginBtn").addEventListener("click", doLogin);
+
+    document.getElementById("loginPass").addEventListener("keydown", (e) => {
+        if (e.key === "Enter") doLogin();
+    });
+
+    document.getElementById("clientSelect").addEventListener("change", (e) => {
+    const client_id = e.target.value;
+    if (client_id) {
+        loadCommandsForClient(client_id);
+    } else {
+        document.getElementById("commandsContainer").innerHTML =
+            `<span class="muted"> Seleccione un panel para habilitar comandos.</span>`;
+    }
+    });
+
+
+    const ok = await loadMe();
+    if (!ok) return; // stay on login overlay
+    refreshClients();
+    refreshLogs();
+    startEventStream();
+
+});
+
+async function loadCommandsForClient(client_id) {
+    const container = document.getElementById("commandsContainer");
+    const status = document.getElementById("commandStatus");
+
+    container.innerHTML = `<span class="muted">Loading commands…</span>`;
+    status.textContent = "";
+
+    try {
+        const res = await fetch(`/clients/${client_id}/commands`);
+        if (!res.ok) {
+            container.innerHTML = `<span class="muted">Failed to load commands</span>`;
+            return;
+        }
+
+        const commands = await res.json();
+
+        container.innerHTML = "";
+
+        if (!commands.length) {
+            container.innerHTML = `<span class="muted">No hay comandos disponibles para esta central.</span>`;
+            return;
+        }
+
+        commands.forEach(cmd => {
+            const btn = document.createElement("button");
+            btn.textContent = cmd.name;
+            btn.title = cmd.description || cmd.name;
+            btn.style.minWidth = "90px";
+
+            // Role-based UI (backend still enforces)
+            if (cmd.admin_only && currentUser.role !== "admin") {
+                btn.disabled = true;
+                btn.style.opacity = "0.4";
+                btn.style.cursor = "not-allowed";
+                btn.title = "Admin only";
+            } else {
+                btn.onclick = () => sendCommand(client_id, cmd.id, cmd.name);
+            }
+
+            container.appendChild(btn);
+        });
+
+    } catch (err) {
+        console.error("loadCommandsForClient error:", err);
+        container.innerHTML = `<span class="muted">Error loading commands</span>`;
+    }
+}
+
+async function sendCommand(client_id, command_id, command_name) {
+    const status = document.getElementById("commandStatus");
+    status.textContent = `Sending ${command_name}…`;
+
+    try {
+        const res = await fetch("/clients/send-command", {
+            method: "POST",
+            headers: {"Content-Type": "application/json"},
+            body: JSON.stringify({ client_id, command_id })
+        });
+
+        if (!res.ok) {
+            const data = await res.json().catch(() => ({}));
+            status.textContent = `Error: ${data.detail || res.status}`;
+            return;
+        }
+
+        status.textContent = `${command_name} Enviado ✅`;
+    } catch (err) {
+        console.error("sendCommand error:", err);
+        status.textContent = "Hubo un error al enviar el comando.";
+    }
+}
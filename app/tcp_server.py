@@ -5,39 +5,115 @@ from datetime import datetime, UTC
 from typing import Dict
 
 from .config import settings
-from .db import get_pool, is_client_id_allowed, insert_system_message, get_client_description
+from .db import (
+    get_pool, is_client_id_allowed, insert_system_message, get_client_description,
+    cached_frame_visibility, frame_visibility,
+)
+from . import queries
+from .events import hub
+from .registry import registry
+from .alive import scheduler
+from .correlation import correlator
+from .outbound import outbound
+from .protocol.views import decode_text, frame_key
+from .decoders import assignments
 
 # In-memory registry of connected clients
 clients: Dict[str, asyncio.StreamWriter] = {}   # {client_id: writer}
 
+# strong refs for fire-and-forget tasks (queued command delivery)
+_background: set[asyncio.Task] = set()
+
+
+def deliver_queued(client_id: str) -> None:
+    """Flush the client's outbound queue without blocking the caller."""
+    task = asyncio.create_task(outbound.deliver_pending(client_id, send_to_client))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
 
 def get_online_clients() -> list[dict]:
     """Expose online clients to API layer."""
-    return [{"client_id": cid, "status": "connected"} for cid in clients.keys()]
+    return [s.to_dict() for s in registry.online()]
+
 
+async def send_to_client(client_id: str, payload: str | bytes, *, record: bool = True) -> datetime:
+    """
+    Used by API routes to send data to a connected TCP client. str payloads are sent UTF-8 encoded.
+    record=False skips the per-send messages INSERT; the caller must pass the returned
+    timestamp to record_outgoing_many (bulk senders such as broadcast).
+    """
+    if isinstance(payload, str):
+        payload = payload.encode()
 
-async def send_to_client(client_id: str, payload: bytes) -> None:
-    """Used by API routes to send data to a connected TCP client."""
     if client_id not in clients:
+        hub.publish("command", {"client_id": client_id, "ok": False, "error": "not connected"})
         raise ValueError(f"Client {client_id} not connected")
 
     writer = clients[client_id]
-    writer.write(payload)
-    await writer.drain()
+    try:
+        writer.write(payload)
+        await writer.drain()
+    except Exception as e:
+        hub.publish("command", {"client_id": client_id, "ok": False, "error": str(e)})
+        raise
+
+    now = datetime.now(UTC)
+    message = payload.decode(errors="replace")
+
+    if record:
+        pool = get_pool()
+        async with pool.acquire() as conn:
+            await queries.execute(
+                conn,
+                "insert_outgoing_message",
+                client_id,
+                now,
+                message if settings.MESSAGES_STORE_TEXT else None,
+                payload,
+            )
+    registry.count_message(client_id, "outgoing")
+
+    hub.publish("command", {"client_id": client_id, "ok": True, "message": message, "timestamp": now})
+
+    print(f"[{datetime.now(UTC).strftime('%H:%M:%S')}] Sent to {client_id}: {payload}")
+    return now
+
 
+async def record_outgoing_many(sent: list[tuple[str, datetime]], payload: bytes) -> None:
+    """One INSERT for the same payload sent to many clients: [(client_id, sent_at), ...]."""
+    if not sent:
+        return
+    message = payload.decode(errors="replace")
     pool = get_pool()
     async with pool.acquire() as conn:
-        await conn.execute(
-            """
-            INSERT INTO messages (client_id, timestamp, direction, message)
-            VALUES ($1, $2, 'outgoing', $3);
-            """,
-            client_id,
-            datetime.now(UTC),
-            payload.decode(errors="replace"),
+        await queries.execute(
+            conn,
+            "insert_outgoing_messages",
+            [cid for cid, _ in sent],
+            [ts for _, ts in sent],
+            message if settings.MESSAGES_STORE_TEXT else None,
+            payload,
         )
 
-    print(f"[{datetime.now(UTC).strftime('%H:%M:%S')}] Sent to {client_id}: {payload}")
+
+async def insert_events(conn, message_id: int, client_id: str, ts: datetime, decoder: str, events: list) -> None:
+    """All events of one frame in one INSERT."""
+    await queries.execute(
+        conn,
+        "insert_events",
+        message_id,
+        client_id,
+        ts,
+        decoder,
+        [ev.event_type for ev in events],
+        [ev.code for ev in events],
+        [ev.account for ev in events],
+        [ev.partition for ev in events],
+        [ev.zone for ev in events],
+        [ev.user_no for ev in events],
+        [ev.restore for ev in events],
+    )
 
 
 async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
@@ -89,75 +165,76 @@ async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWrit
     desc_label = f" - {description}" if description else ""
     print(f"[{datetime.now(UTC).strftime('%H:%M:%S')}] Client identified & allowed: {client_id}{desc_label}")
 
-    # 2) Register client in memory and in DB
+    # 2) Register client in memory (registry persists it write-behind)
     clients[client_id] = writer
+    registry.connect(client_id, ip, port, description)
 
-    async with pool.acquire() as conn:
-        now = datetime.now(UTC)
-        await conn.execute(
-            """
-            INSERT INTO clients (client_id, ip, port, status, connected_at, last_seen)
-            VALUES ($1, $2, $3, 'connected', $4, $4)
-            ON CONFLICT (client_id) DO UPDATE
-            SET ip = EXCLUDED.ip,
-                port = EXCLUDED.port,
-                status = 'connected',
-                connected_at = EXCLUDED.connected_at,
-                last_seen = EXCLUDED.last_seen;
-            """,
-            client_id,
-            ip,
-            port,
-            now,
-        )
+    # commands queued while it was offline go out first, in order
+    deliver_queued(client_id)
 
     # 3) Main message loop
     try:
         while True:
-            data = await reader.read(1024)
-            if not data:
+            raw = await reader.read(1024)
+            if not raw:
                 break
-            
-            data = data.replace(b'\x00', b'')  # Remove null bytes
-            data = data.replace(b'\x07', b'\x53\x49\x52\x45\x4E\x41\x53\x20\x41\x43\x54\x49\x56\x41\x44\x41\x53')  # Remove null bytes
-            message = data.decode(errors="replace").strip()
-            if not message:
-                continue                
-            
+            registry.touch(client_id)
+
+            # matching works on bytes; no decode needed for alive answers / replies
+            key = frame_key(raw)
+            if not key:
+                continue
+
+            if scheduler.match_response(client_id, key):
+                # alive answer: registry already flipped alive_status, nothing to store
+                continue
+
+            # reply to a command we are tracking? still stored like any other frame
+            reply = correlator.match(client_id, key)
+
+            # brand decoder (if the client has one) turns the frame into structured events
+            decoder = assignments.get(client_id)
+            events = []
+            if decoder is not None:
+                try:
+                    events = decoder.decode(raw)
+                except Exception as e:
+                    print(f"[DECODERS] {decoder.name} failed on frame from {client_id}: {e}")
+
+            # the frame is stored as received; text is only derived when it is stored too
+            # or an open dashboard is listening
+            live = hub.has_subscribers
+            message = decode_text(raw) if settings.MESSAGES_STORE_TEXT or live else None
+            ts = datetime.now(UTC)
             async with pool.acquire() as conn:
-                expected = await conn.fetchval(
-                    """
-                    SELECT alive_expected_response
-                    FROM allowed_clients
-                    WHERE client_id = $1 AND alive_enabled = TRUE
-                    """,
+                msg_id = await queries.fetchval(
+                    conn,
+                    "insert_incoming_message",
                     client_id,
+                    ts,
+                    message if settings.MESSAGES_STORE_TEXT else None,
+                    raw,
                 )
+                if events:
+                    await insert_events(conn, msg_id, client_id, ts, decoder.name, events)
+            registry.count_message(client_id, "incoming")
 
-            if message.strip() == expected:
-                async with pool.acquire() as conn:
-                    await conn.execute(
-                        """
-                        UPDATE clients
-                        SET alive_status = 'connected'
-                        WHERE client_id = $1
-                        """,
-                        client_id,
-                    )
-            else:
-                async with pool.acquire() as conn:
-                    await conn.execute(
-                        """
-                        INSERT INTO messages (client_id, timestamp, direction, message)
-                        VALUES ($1, $2, 'incoming', $3);
-                        """,
-                        client_id,
-                        datetime.now(UTC),
-                        message,
-                    )
-            
-            
-                    
+            if live:
+                visible = cached_frame_visibility(key)
+                if visible is None:
+                    visible = await frame_visibility(key, message)
+                hub.publish("message", {
+                    "id": msg_id,
+                    "client_id": client_id,
+                    "description": description,
+                    "direction": "incoming",
+                    "message": message,
+                    "timestamp": ts,
+                    "visible": visible,
+                    "reply_to": reply.command_name if reply else None,
+                })
+            for ev in events:
+                hub.publish("panel_event", {"client_id": client_id, "timestamp": ts, **ev.to_dict()})
 
     except ConnectionResetError:
         print(f"[{datetime.now(UTC).strftime('%H:%M:%S')}] {client_id} disconnected forcibly")
@@ -170,20 +247,11 @@ async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWrit
         except Exception:
             pass
 
-        clients.pop(client_id, None)
-
-        async with pool.acquire() as conn:
-            await conn.execute(
-                """
-                UPDATE clients
-                SET status = 'disconnected',
-                    last_seen = $2
-                    alive_status = NULL
-                WHERE client_id = $1;
-                """,
-                client_id,
-                datetime.now(UTC),
-            )
+        # a reconnect may already have replaced this writer; don't mark that one offline
+        if clients.get(client_id) is writer:
+            clients.pop(client_id, None)
+            registry.disconnect(client_id)
+            correlator.drop(client_id)
 
         print(f"[{datetime.now(UTC).strftime('%H:%M:%S')}] Client {client_id} connection closed")
 
@@ -6,11 +6,25 @@ from app.config import settings
 from app.db import init_db_pool
 from app.tcp_server import start_tcp_server
 from app.poller import alive_poller
+from app.registry import registry
+from app.notify import run_listener, on_notify
+from app.commands import catalog
+from app.outbound import outbound
+from app.decoders import assignments
+from app.auth_session import session_cache, housekeeping
+from app.audit import audit_sink
 
 
 async def main():
     # 1) Init DB pool and schema
     await init_db_pool()
+    await registry.load()
+    await catalog.load()
+    on_notify("commands_changed", catalog.request_reload)
+    await assignments.load()
+    on_notify("allowed_clients_changed", assignments.request_reload)
+    on_notify("users_changed", session_cache.on_users_changed)
+    on_notify("sessions_changed", session_cache.on_sessions_changed)
 
     # 2) Create FastAPI app
     app = create_app()
@@ -23,6 +37,11 @@ async def main():
         start_tcp_server(),
         server.serve(),
         alive_poller(),
+        registry.run_flusher(),
+        run_listener(),
+        outbound.run_sweeper(),
+        housekeeping.run_sweeper(),
+        audit_sink.run(),
     )
 
 
@@ -0,0 +1,78 @@
+"""
+Micro-benchmark for the brand frame decoders (app/decoders): microseconds per frame for
+typical hits and for frames a decoder does not understand.
+
+    DATABASE_URL=postgresql://unused python -m scripts.bench_decoders [--number N]
+
+(DATABASE_URL is only needed because importing `app` loads the settings; no DB is used.)
+"""
+import argparse
+import struct
+import timeit
+
+from app.decoders import get_decoder
+from app.protocol.checksums import sum8
+
+
+def cid_record(account: int, q: int, code: int, partition: int, number: int) -> bytes:
+    body = struct.pack(">HBHBH", account, q, code, partition, number)
+    return b"\x02" + body + bytes((sum8(body),)) + b"\x03"
+
+
+FRAMES = {
+    "contact_id": [
+        ("fire alarm", b"1234 18 1 110 01 012\r\n"),
+        ("closing", b"123418340101001\r\n"),
+        ("miss", b"SERIAL NUMBER = 0010365116\r\n"),
+    ],
+    "sia": [
+        ("fire alarm", b"#1234|Nri1/FA012\r\n"),
+        ("3 items", b"#1234|Nri1/BA003/BA004/TA005\r\n"),
+        ("miss", b"SERIAL NUMBER = 0010365116\r\n"),
+    ],
+    "notifier": [
+        ("fire alarm", b"FIRE ALARM  SMOKE (PHOTO) 3RD FLOOR  10:15A 031224 L1D012 Z012\r\n"),
+        ("trouble", b"TROUBLE     OPEN CIRCUIT  10:16A 031224 L1M003\r\n"),
+        ("miss", b"#NFS640.027.001\r\n"),
+    ],
+    "cid_binary": [
+        ("fire alarm", cid_record(0x1234, 1, 110, 1, 12)),
+        ("2 records", cid_record(0x1234, 1, 130, 1, 3) + cid_record(0x1234, 3, 401, 1, 7)),
+        ("miss", b"SERIAL NUMBER = 0010365116\r\n"),
+    ],
+}
+
+
+def self_check() -> None:
+    ev = get_decoder("contact_id").decode(b"1234 18 1 110 01 012")[0]
+    assert (ev.event_type, ev.zone, ev.partition, ev.code) == ("fire_alarm", 12, 1, "E110"), ev
+    ev = get_decoder("contact_id").decode(b"123418340101001")[0]
+    assert (ev.event_type, ev.user_no, ev.code) == ("arm", 1, "R401"), ev
+    evs = get_decoder("sia").decode(b"#1234|Nri1/BA003/BA004/TA005")
+    assert [(e.event_type, e.zone, e.partition) for e in evs] == [
+        ("burglary_alarm", 3, 1), ("burglary_alarm", 4, 1), ("tamper", 5, 1)], evs
+    ev = get_decoder("notifier").decode(FRAMES["notifier"][0][1])[0]
+    assert (ev.event_type, ev.zone, ev.code) == ("fire_alarm", 12, "FIRE ALARM L1D012"), ev
+    evs = get_decoder("cid_binary").decode(FRAMES["cid_binary"][1][1])
+    assert [(e.event_type, e.zone, e.user_no) for e in evs] == [
+        ("burglary_alarm", 3, None), ("arm", None, 7)], evs
+    for name, cases in FRAMES.items():
+        assert get_decoder(name).decode(cases[-1][1]) == [], name
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=50000)
+    args = parser.parse_args()
+
+    self_check()
+
+    for name, cases in FRAMES.items():
+        decoder = get_decoder(name)
+        for label, frame in cases:
+            seconds = min(timeit.repeat(lambda: decoder.decode(frame), number=args.number, repeat=5))
+            print(f"{name + ' / ' + label:<32} {seconds / args.number * 1e6:8.3f} us/frame")
+
+
+if __name__ == "__main__":
+    main()
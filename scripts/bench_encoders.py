@@ -0,0 +1,89 @@
+"""
+Micro-benchmark for command encoding: checksum algorithms (table driven vs bitwise
+reference) and template compile/render cost.
+
+    DATABASE_URL=postgresql://unused python -m scripts.bench_encoders [--number N]
+
+(DATABASE_URL is only needed because importing `app` loads the settings; no DB is used.)
+"""
+import argparse
+import timeit
+
+from app.protocol.checksums import CHECKSUMS, crc16_modbus, crc_ccitt
+from app.protocol.encoder import build_payload, compile_command
+
+
+def crc16_modbus_bitwise(data: bytes) -> int:
+    crc = 0xFFFF
+    for b in data:
+        crc ^= b
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+def crc_ccitt_bitwise(data: bytes) -> int:
+    crc = 0xFFFF
+    for b in data:
+        crc ^= b << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) & 0xFFFF if crc & 0x8000 else (crc << 1) & 0xFFFF
+    return crc
+
+
+def self_check() -> None:
+    check = b"123456789"
+    assert crc16_modbus(check) == crc16_modbus_bitwise(check) == 0x4B37
+    assert crc_ccitt(check) == crc_ccitt_bitwise(check) == 0x29B1
+    frame = build_payload({"payload": "01 03 {register:u16} {count:u16=2}", "encoding": "hex",
+                           "checksum": "crc16_modbus"}, {"register": 0})
+    assert frame == bytes.fromhex("010300000002C40B"), frame.hex()
+    # zero-padded decimal defaults are plain decimal, not an octal-literal error
+    zone = compile_command({"payload": "Z{zone:u8=01}", "encoding": "ascii"})
+    assert zone.render() == b"Z1" and zone.render({"zone": 12}) == b"Z12", zone.render()
+    mask = compile_command({"payload": "{mask:u8=0x0A} {level:u8=007}", "encoding": "hex"})
+    assert mask.render() == bytes((0x0A, 7)), mask.render()
+
+
+def bench(label: str, fn, number: int) -> None:
+    seconds = min(timeit.repeat(fn, number=number, repeat=5))
+    print(f"{label:<44} {seconds / number * 1e6:9.3f} us/op")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+    n = args.number
+
+    self_check()
+
+    print("== checksums ==")
+    for size in (8, 64, 1024):
+        data = bytes(range(256)) * (size // 256) + bytes(range(size % 256))
+        reps = max(n * 8 // size, 100)
+        for name, fn in CHECKSUMS.items():
+            bench(f"{name} ({size} B)", lambda: fn(data), reps)
+        bench(f"crc16_modbus bitwise ({size} B)", lambda: crc16_modbus_bitwise(data), reps)
+        bench(f"crc_ccitt bitwise ({size} B)", lambda: crc_ccitt_bitwise(data), reps)
+
+    print("== templates ==")
+    modbus = {"payload": "{unit:u8=1} 03 {register:u16} {count:u16=2}", "encoding": "hex",
+              "checksum": "crc16_modbus"}
+    ascii_cmd = {"payload": "ZONE {zone:u8} ARM", "encoding": "ascii", "checksum": "xor",
+                 "append_cr": True}
+    static = {"payload": "01 03 00 00 00 02", "encoding": "hex", "checksum": "crc16_modbus"}
+
+    compiled_modbus = compile_command(modbus)
+    compiled_ascii = compile_command(ascii_cmd)
+    compiled_static = compile_command(static)
+    params = {"register": 0x0010}
+
+    bench("compile + render (modbus, per call)", lambda: build_payload(modbus, params), n)
+    bench("render precompiled (modbus)", lambda: compiled_modbus.render(params), n)
+    bench("render precompiled (ascii zone)", lambda: compiled_ascii.render({"zone": 7}), n)
+    bench("render precompiled (static)", lambda: compiled_static.render(), n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Login flood vs. TCP ingest latency.
+
+Runs a local asyncio TCP server that timestamps every frame it receives (the same event
+loop shape as main.py: TCP ingest and the API share one loop), a panel that sends a frame
+every few ms, and a flood of concurrent Argon2 password checks. Three rounds:
+
+  baseline  no logins
+  inline    verify_password() called on the event loop (the old /auth/login behaviour)
+  offload   login_guard.slot() + verify_password_async() (thread pool, capped concurrency)
+
+and prints the frame latency distribution for each.
+
+    DATABASE_URL=postgresql://unused python -m scripts.bench_login_flood [--seconds 3] [--attackers 32]
+
+(DATABASE_URL is only needed because importing `app` loads the settings; no DB is used.)
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import HTTPException
+
+from app.auth_session import hash_password, login_guard, verify_password, verify_password_async
+from app.latency import LatencyHistogram
+
+FRAME_INTERVAL = 0.005
+
+
+async def run_round(mode: str, seconds: float, attackers: int, password_hash: str) -> None:
+    hist = LatencyHistogram()
+    logins = 0
+    rejected = 0
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while line := await reader.readline():
+            hist.record(time.perf_counter() - float(line))
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    _, writer = await asyncio.open_connection("127.0.0.1", port)
+    deadline = time.perf_counter() + seconds
+
+    async def panel() -> None:
+        while time.perf_counter() < deadline:
+            writer.write(f"{time.perf_counter()!r}\n".encode())
+            await writer.drain()
+            await asyncio.sleep(FRAME_INTERVAL)
+        writer.close()
+        await writer.wait_closed()
+
+    async def attacker() -> None:
+        nonlocal logins, rejected
+        while time.perf_counter() < deadline:
+            if mode == "inline":
+                verify_password("wrong password", password_hash)
+                await asyncio.sleep(0)
+            else:
+                try:
+                    async with login_guard.slot():
+                        await verify_password_async("wrong password", password_hash)
+                except HTTPException:
+                    rejected += 1
+                    continue
+            logins += 1
+
+    tasks = [panel()]
+    if mode != "baseline":
+        tasks += [attacker() for _ in range(attackers)]
+    await asyncio.gather(*tasks)
+    await asyncio.sleep(0.2)  # let the server drain frames still in flight
+    server.close()
+    await server.wait_closed()
+
+    s = {k: ("-" if v is None else v) for k, v in hist.summary().items()}
+    print(
+        f"{mode:<9} frames={s['count']:<5} p50={s['p50_ms']:>8} ms  p99={s['p99_ms']:>8} ms  "
+        f"max={s['max_ms']:>8} ms  logins/s={logins / seconds:7.1f}  busy-rejected={rejected}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--attackers", type=int, default=32)
+    args = parser.parse_args()
+
+    password_hash = hash_password("correct horse battery staple")
+    for mode in ("baseline", "inline", "offload"):
+        await run_round(mode, args.seconds, args.attackers, password_hash)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())